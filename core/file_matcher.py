@@ -1,4 +1,5 @@
 import os
+import logging
 import zipfile
 import tempfile
 from collections import defaultdict, Counter
@@ -11,9 +12,11 @@ from .html_parser import HTMLParser
 from .structure_comparator import StructureComparator
 from .css_style_checker import CSSStyleChecker
 from .tailwind_analyzer import TailwindAnalyzer
-from .jsx_treesitter_parser import parse_jsx_with_treesitter
+from .jsx_treesitter_parser import parse_jsx_with_treesitter, clear_parse_cache
 from .js_logic_analyzer import JSLogicAnalyzer
 
+logger = logging.getLogger(__name__)
+
 # --- Step 1: Unzip & list files ---
 def unzip_to_tempdir(zip_path: str) -> str:
     """Unzips a zip file to a temporary directory and returns the path."""
@@ -246,6 +249,13 @@ def structure_match_jsx(unmatched1, unmatched2, dir1, dir2, threshold=0.5):
     comparator = StructureComparator()
     matches = []
     used2 = set()
+    if not unmatched1:
+        return matches
+    # Parse and size every candidate once instead of once per f1
+    trees2 = {}
+    for f2 in unmatched2:
+        tree2 = parse_jsx_with_treesitter(os.path.join(dir2, f2))
+        trees2[f2] = (tree2, count_meaningful_nodes(tree2, 'jsx'))
     for f1 in unmatched1:
         best_score = 0
         best_f2 = None
@@ -254,8 +264,7 @@ def structure_match_jsx(unmatched1, unmatched2, dir1, dir2, threshold=0.5):
         for f2 in unmatched2:
             if f2 in used2:
                 continue
-            tree2 = parse_jsx_with_treesitter(os.path.join(dir2, f2))
-            n2 = count_meaningful_nodes(tree2, 'jsx')
+            tree2, n2 = trees2[f2]
             if n1 < 2 or n2 < 2:
                 if n1 == 1 and n2 == 1:
                     score = strict_single_node_similarity(tree1, tree2, 'jsx', comparator=comparator)
@@ -399,6 +408,13 @@ def handler(signum, frame):
 
 # --- Main orchestrator for full matching and comparison workflow ---
 def match_and_compare_all(original_dir: str, modified_dir: str) -> Dict:
+    try:
+        return _match_and_compare_all(original_dir, modified_dir)
+    finally:
+        # Parsed JSX trees are only reused within a run; each upload is unzipped to a fresh temp dir
+        clear_parse_cache()
+
+def _match_and_compare_all(original_dir: str, modified_dir: str) -> Dict:
     print('--- [LOG] Starting match_and_compare_all ---')
     file_types = ['html', 'css', 'jsx', 'js']
     results = {
@@ -756,7 +772,7 @@ def match_and_compare_all(original_dir: str, modified_dir: str) -> Dict:
         'files_matched': files_matched,
         'files_unmatched': files_unmatched
     }
-    print('[DEBUG] JS summary before return:', results['summary']['js'])
+    logger.debug('JS summary before return: %s', results['summary']['js'])
     results['similarity_scores'] = {
         'overall': results.get('overall_similarity', 0.0),
         'html': results.get('html', {}).get('aggregate_score', 0.0),
@@ -773,11 +789,16 @@ def match_and_compare_all(original_dir: str, modified_dir: str) -> Dict:
     mod_config_files = list_files_by_type(modified_dir).get('tailwind_config', [])
     config_results = []
     if orig_config_files and mod_config_files:
+        # Require every config in one Node.js process up front; the pairwise loop then reads the analyzer's cache
+        tailwind_analyzer.load_configs([os.path.join(original_dir, f) for f in orig_config_files] +
+                                       [os.path.join(modified_dir, f) for f in mod_config_files])
         for orig_cfg in orig_config_files:
             for mod_cfg in mod_config_files:
-                print(f"[DEBUG] Running Tailwind config comparison for: {orig_cfg} vs {mod_cfg}")
+                logger.debug("Running Tailwind config comparison for: %s vs %s", orig_cfg, mod_cfg)
                 cfg_result = tailwind_analyzer.compare_configs(os.path.join(original_dir, orig_cfg), os.path.join(modified_dir, mod_cfg))
-                print(f"[DEBUG] Tailwind config comparison result: improved_config_similarity={cfg_result.get('improved_config_similarity')}, shared_config_keys={cfg_result.get('shared_config_keys')}, only_in_original_config={cfg_result.get('only_in_original_config')}, only_in_user_config={cfg_result.get('only_in_user_config')}")
+                logger.debug("Tailwind config comparison result: improved_config_similarity=%s, shared_config_keys=%s, only_in_original_config=%s, only_in_user_config=%s",
+                             cfg_result.get('improved_config_similarity'), cfg_result.get('shared_config_keys'),
+                             cfg_result.get('only_in_original_config'), cfg_result.get('only_in_user_config'))
                 config_results.append(cfg_result)
     # --- Aggregate config similarity into results['tailwind'] ---
     if 'tailwind' in results:
@@ -802,16 +823,16 @@ def match_and_compare_all(original_dir: str, modified_dir: str) -> Dict:
 
     # Ensure JS keys are always present before returning results
     if 'js' not in results['file_matches']:
-        print('[DEBUG] Adding missing js to file_matches')
+        logger.debug('Adding missing js to file_matches')
         results['file_matches']['js'] = []
     if 'js' not in results['unmatched']:
-        print('[DEBUG] Adding missing js to unmatched')
+        logger.debug('Adding missing js to unmatched')
         results['unmatched']['js'] = {'original': [], 'modified': []}
     if 'js' not in results['similarity_scores']:
-        print('[DEBUG] Adding missing js to similarity_scores')
+        logger.debug('Adding missing js to similarity_scores')
         results['similarity_scores']['js'] = 0.0
     if 'js' not in results['summary']:
-        print('[DEBUG] Adding missing js to summary')
+        logger.debug('Adding missing js to summary')
         results['summary']['js'] = {
             'total_functions': 0,
             'matching_functions': 0,
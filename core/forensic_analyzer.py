@@ -8,9 +8,7 @@ from pathlib import Path
 import json
 from .html_parser import HTMLParser
 from .structure_comparator import StructureComparator, ComparisonResult
-import subprocess
-import tempfile
-from core.jsx_treesitter_parser import parse_jsx_with_treesitter, tree_similarity
+from core.jsx_treesitter_parser import parse_jsx_with_treesitter, parse_jsx_code, tree_similarity
 from core.js_logic_analyzer import JSLogicAnalyzer
 
 class TemplateComparison:
@@ -145,11 +143,7 @@ class ForensicAnalyzer:
     def _parse_jsx(self, content: str) -> Dict:
         """Parse JSX content using the Python tree-sitter parser (prebuilt binary)."""
         try:
-            with tempfile.NamedTemporaryFile(suffix='.jsx', delete=False, mode='w', encoding='utf-8') as jsx_file:
-                jsx_file.write(content)
-                jsx_file_path = jsx_file.name
-            ast = parse_jsx_with_treesitter(jsx_file_path)
-            return ast
+            return parse_jsx_code(content.encode('utf-8'))
         except Exception as e:
             print(f"Error running Python tree-sitter JSX parser: {e}")
             return {}
@@ -8,8 +8,6 @@ from typing import Dict, List, Union, Optional
 from pathlib import Path
 import logging
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 class HTMLParser:
@@ -30,7 +28,7 @@ class HTMLParser:
             
             with open(path, 'r', encoding='utf-8') as f:
                 content = f.read()
-                logger.debug(f"Successfully read file, content length: {len(content)}")
+                logger.debug("Successfully read file, content length: %d", len(content))
                 
             return self.parse(content)
             
@@ -42,7 +40,7 @@ class HTMLParser:
         """Parse HTML content into a structured format."""
         try:
             logger.info("Starting HTML parsing")
-            logger.debug(f"Input HTML content length: {len(html_content)}")
+            logger.debug("Input HTML content length: %d", len(html_content))
 
             # Parse HTML using BeautifulSoup
             soup = BeautifulSoup(html_content, 'html.parser')
@@ -50,7 +48,7 @@ class HTMLParser:
 
             # Start with the body tag if it exists, otherwise use the root
             root = soup.body if soup.body else soup
-            logger.debug(f"Using root element: {root.name}")
+            logger.debug("Using root element: %s", root.name)
 
             # Parse the tree structure
             result = self._parse_node(root)
@@ -68,15 +66,15 @@ class HTMLParser:
             if node.name is None or isinstance(node, (str, bytes)):
                 text_content = str(node).strip()
                 if text_content:
-                    logger.debug(f"Found text node: {text_content[:50]}...")
+                    logger.debug("Found text node: %.50s...", text_content)
                     return {'type': 'text', 'content': text_content}
                 return None
 
-            logger.debug(f"Parsing node: {node.name}")
+            logger.debug("Parsing node: %s", node.name)
 
             # Extract attributes
             attrs = self._parse_attributes(node)
-            logger.debug(f"Node attributes: {attrs}")
+            logger.debug("Node attributes: %s", attrs)
 
             # Parse children
             children = []
@@ -85,7 +83,7 @@ class HTMLParser:
                 if child_node:
                     children.append(child_node)
 
-            logger.debug(f"Node {node.name} has {len(children)} children")
+            logger.debug("Node %s has %d children", node.name, len(children))
 
             # Build node structure
             result = {
@@ -108,12 +106,12 @@ class HTMLParser:
             
             # Convert BeautifulSoup attrs to dict
             for key, value in node.attrs.items():
-                logger.debug(f"Processing attribute: {key}")
+                logger.debug("Processing attribute: %s", key)
                 
                 # Handle class attribute specially
                 if key == 'class':
                     attrs[key] = value if isinstance(value, list) else value.split()
-                    logger.debug(f"Processed class attribute: {attrs[key]}")
+                    logger.debug("Processed class attribute: %s", attrs[key])
                 # Handle style attribute
                 elif key == 'style':
                     if isinstance(value, dict):
@@ -125,11 +123,11 @@ class HTMLParser:
                                 prop, val = style.split(':', 1)
                                 style_dict[prop.strip()] = val.strip()
                         attrs[key] = style_dict
-                    logger.debug(f"Processed style attribute: {attrs[key]}")
+                    logger.debug("Processed style attribute: %s", attrs[key])
                 # Handle other attributes
                 else:
                     attrs[key] = value
-                    logger.debug(f"Processed {key} attribute: {value}")
+                    logger.debug("Processed %s attribute: %s", key, value)
 
             return attrs
 
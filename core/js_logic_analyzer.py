@@ -4,6 +4,7 @@ Analyzes and compares JavaScript/TypeScript code logic similarity.
 """
 
 import os
+import sys
 from typing import Dict, List, Tuple, Optional, Any
 from tree_sitter import Language, Parser
 import platform
@@ -12,10 +13,34 @@ import difflib
 import re
 import logging
 
-# Set up logging
-logging.basicConfig(level=logging.DEBUG)
+try:
+    from rapidfuzz.fuzz import ratio as _rf_ratio
+except ImportError:
+    _rf_ratio = None
+
 logger = logging.getLogger(__name__)
 
+class ASTNode:
+    """Normalized AST node. Slotted instead of a dict to keep large trees compact."""
+    __slots__ = ('type', 'name', 'value', 'callee', 'text', 'children',
+                 'parameters', 'body', 'condition', 'source', 'specifiers', 'methods')
+
+    def __init__(self, type: str, name: Optional[str] = None, value: Optional[str] = None,
+                 callee: Optional[str] = None, text: Optional[str] = None,
+                 children: Optional[List['ASTNode']] = None):
+        self.type = type
+        self.name = name
+        self.value = value
+        self.callee = callee
+        self.text = text
+        self.children = children if children is not None else []
+        self.parameters = []
+        self.body = None
+        self.condition = None
+        self.source = None
+        self.specifiers = []
+        self.methods = []
+
 class JSLogicAnalyzer:
     def __init__(self):
         try:
@@ -53,11 +78,12 @@ class JSLogicAnalyzer:
         """Parse JS/TS file using tree-sitter and return normalized AST and call graph."""
         try:
             logger.debug(f"Parsing file: {file_path}")
-            with open(file_path, 'r', encoding='utf-8') as f:
+            # tree-sitter works on UTF-8 bytes and reports byte offsets, so keep the source as bytes
+            with open(file_path, 'rb') as f:
                 code = f.read()
             ext = os.path.splitext(file_path)[1].lower()
             parser = self.ts_parser if ext == '.ts' else self.js_parser
-            tree = parser.parse(bytes(code, 'utf-8'))
+            tree = parser.parse(code)
             if not tree:
                 logger.warning(f"Parser returned no tree for file: {file_path}")
                 return {}
@@ -69,7 +95,7 @@ class JSLogicAnalyzer:
             logger.error(f"Error parsing file {file_path}: {str(e)}", exc_info=True)
             return {}
 
-    def _normalize_ast_with_call_graph(self, node: Any, code: str, id_map=None, lit_map=None, id_counter=None, lit_counter=None, call_graph=None, function_stack=None, anon_func_counter=None):
+    def _normalize_ast_with_call_graph(self, node: Any, code: bytes, id_map=None, lit_map=None, id_counter=None, lit_counter=None, call_graph=None, function_stack=None, anon_func_counter=None):
         """Normalize AST and extract call graph (function -> called functions)."""
         if id_map is None:
             id_map = {}
@@ -86,21 +112,23 @@ class JSLogicAnalyzer:
         if anon_func_counter is None:
             anon_func_counter = [0]
         if not node:
-            return {}, call_graph
+            return None, call_graph
+        # Interned so the same type string is shared by every node (and both trees)
+        node_type = sys.intern(node.type)
         # Normalize identifiers
-        if node.type == 'identifier':
+        if node_type == 'identifier':
             name = node.text.decode('utf-8')
             if name not in id_map:
-                id_map[name] = f'id{len(id_map)}'
-            return {'type': 'identifier', 'name': id_map[name]}, call_graph
+                id_map[name] = sys.intern(f'id{len(id_map)}')
+            return ASTNode('identifier', name=id_map[name]), call_graph
         # Normalize literals
-        if node.type in ('string', 'string_literal', 'number', 'number_literal', 'true', 'false', 'boolean'):
+        if node_type in ('string', 'string_literal', 'number', 'number_literal', 'true', 'false', 'boolean'):
             lit_key = node.text.decode('utf-8')
             if lit_key not in lit_map:
-                lit_map[lit_key] = f'lit{len(lit_map)}'
-            return {'type': node.type, 'value': lit_map[lit_key]}, call_graph
+                lit_map[lit_key] = sys.intern(f'lit{len(lit_map)}')
+            return ASTNode(node_type, value=lit_map[lit_key]), call_graph
         # Function definitions
-        if node.type in ('function_declaration', 'function_expression', 'arrow_function', 'method_definition'):
+        if node_type in ('function_declaration', 'function_expression', 'arrow_function', 'method_definition'):
             func_name = self._get_node_name(node) or f"anon_func_{anon_func_counter[0]}"
             if not self._get_node_name(node):
                 anon_func_counter[0] += 1
@@ -111,9 +139,9 @@ class JSLogicAnalyzer:
                 norm_child, call_graph = self._normalize_ast_with_call_graph(child, code, id_map, lit_map, id_counter, lit_counter, call_graph, function_stack, anon_func_counter)
                 children.append(norm_child)
             function_stack.pop()
-            return {'type': node.type, 'name': func_name, 'children': children}, call_graph
+            return ASTNode(node_type, name=func_name, children=children), call_graph
         # Call expressions
-        if node.type == 'call_expression':
+        if node_type == 'call_expression':
             callee = self._get_callee_name(node, id_map)
             if function_stack and callee:
                 call_graph[function_stack[-1]].add(callee)
@@ -121,17 +149,17 @@ class JSLogicAnalyzer:
             for child in node.children:
                 norm_child, call_graph = self._normalize_ast_with_call_graph(child, code, id_map, lit_map, id_counter, lit_counter, call_graph, function_stack, anon_func_counter)
                 children.append(norm_child)
-            return {'type': node.type, 'callee': callee, 'children': children}, call_graph
+            return ASTNode(node_type, callee=callee, children=children), call_graph
         # Default: recurse
         children = []
         for child in node.children:
             norm_child, call_graph = self._normalize_ast_with_call_graph(child, code, id_map, lit_map, id_counter, lit_counter, call_graph, function_stack, anon_func_counter)
             children.append(norm_child)
-        return {
-            'type': node.type,
-            'children': children,
-            'text': code[node.start_byte:node.end_byte] if node.child_count == 0 else None
-        }, call_graph
+        return ASTNode(
+            node_type,
+            text=code[node.start_byte:node.end_byte].decode('utf-8', 'replace') if node.child_count == 0 else None,
+            children=children
+        ), call_graph
 
     def _get_callee_name(self, node: Any, id_map) -> str:
         for child in node.children:
@@ -159,35 +187,26 @@ class JSLogicAnalyzer:
         """Compare two JS/TS files and return similarity analysis, including function match counts and call graph similarity."""
         parsed1 = self.parse_file(file1)
         parsed2 = self.parse_file(file2)
-        tree1 = parsed1.get('ast', {})
-        tree2 = parsed2.get('ast', {})
+        tree1 = parsed1.get('ast')
+        tree2 = parsed2.get('ast')
         call_graph1 = parsed1.get('call_graph', {})
         call_graph2 = parsed2.get('call_graph', {})
+        functions1 = self._extract_functions(tree1)
+        functions2 = self._extract_functions(tree2)
         # Calculate various similarity metrics
-        function_similarity = self._compare_functions(tree1, tree2)
+        function_similarity, best_scores, best_indices = self._compare_functions(functions1, functions2)
         import_similarity = self._compare_imports(tree1, tree2)
         class_similarity = self._compare_classes(tree1, tree2)
         control_flow_similarity = self._compare_control_flow(tree1, tree2)
         call_graph_similarity = self.compare_call_graphs(call_graph1, call_graph2)
-        # Function-level match counts
-        functions1 = self._extract_functions(tree1)
-        functions2 = self._extract_functions(tree2)
+        # Function-level match counts, derived from the same pairwise pass
         total_functions = max(len(functions1), len(functions2))
         matching_functions = 0
         different_functions = 0
         missing_functions = 0
         extra_functions = 0
         matched2 = set()
-        for func1 in functions1:
-            best_score = 0.0
-            best_idx = -1
-            for idx2, func2 in enumerate(functions2):
-                sig_similarity = self._compare_function_signatures(func1, func2)
-                body_similarity = self._compare_function_bodies(func1, func2)
-                similarity = sig_similarity * 0.3 + body_similarity * 0.7
-                if similarity > best_score:
-                    best_score = similarity
-                    best_idx = idx2
+        for best_score, best_idx in zip(best_scores, best_indices):
             if best_score > 0.8:
                 matching_functions += 1
                 if best_idx >= 0:
@@ -223,73 +242,80 @@ class JSLogicAnalyzer:
             }
         }
 
-    def _compare_functions(self, tree1: Dict, tree2: Dict) -> float:
-        """Compare function declarations between two ASTs."""
-        functions1 = self._extract_functions(tree1)
-        functions2 = self._extract_functions(tree2)
-        
+    def _compare_functions(self, functions1: List[ASTNode], functions2: List[ASTNode]) -> Tuple[float, List[float], List[int]]:
+        """Compare function declarations between two ASTs.
+
+        Returns the aggregate similarity plus, for each function in functions1,
+        its best score and the index of that best match in functions2 (-1 if none).
+        """
         if not functions1 and not functions2:
-            return 1.0
+            return 1.0, [], []
         if not functions1 or not functions2:
-            return 0.0
+            return 0.0, [0.0] * len(functions1), [-1] * len(functions1)
             
         # Compare function signatures and bodies
-        matches = 0
+        best_scores = []
+        best_indices = []
         total = max(len(functions1), len(functions2))
         
         for func1 in functions1:
             best_match = 0.0
-            for func2 in functions2:
+            best_idx = -1
+            for idx2, func2 in enumerate(functions2):
                 # Compare function signatures
                 sig_similarity = self._compare_function_signatures(func1, func2)
                 # Compare function bodies
                 body_similarity = self._compare_function_bodies(func1, func2)
                 # Combined similarity
                 similarity = sig_similarity * 0.3 + body_similarity * 0.7
-                best_match = max(best_match, similarity)
-            matches += best_match
+                if similarity > best_match:
+                    best_match = similarity
+                    best_idx = idx2
+            best_scores.append(best_match)
+            best_indices.append(best_idx)
             
-        return matches / total
+        return sum(best_scores) / total, best_scores, best_indices
 
-    def _extract_functions(self, tree: Dict) -> List[Dict]:
+    def _extract_functions(self, tree: Optional[ASTNode]) -> List[ASTNode]:
         """Extract all function declarations from AST."""
         functions = []
         def traverse(node):
-            if node.get('type') in ('function_declaration', 'method_definition'):
+            if node.type in ('function_declaration', 'method_definition'):
                 functions.append(node)
-            for child in node.get('children', []):
+            for child in node.children:
                 traverse(child)
-        traverse(tree)
+        if tree is not None:
+            traverse(tree)
         return functions
 
-    def _compare_function_signatures(self, func1: Dict, func2: Dict) -> float:
+    def _compare_function_signatures(self, func1: ASTNode, func2: ASTNode) -> float:
         """Compare function signatures (name and parameters)."""
-        if func1.get('name') != func2.get('name'):
+        if func1.name != func2.name:
             return 0.0
             
-        params1 = func1.get('parameters', [])
-        params2 = func2.get('parameters', [])
+        params1 = func1.parameters
+        params2 = func2.parameters
         
         if len(params1) != len(params2):
             return 0.5  # Partial match if parameter count differs
             
         return 1.0  # Full match if names and parameter counts match
 
-    def _tree_similarity(self, node1: Dict, node2: Dict) -> float:
+    def _tree_similarity(self, node1: Optional[ASTNode], node2: Optional[ASTNode]) -> float:
         """Recursively compare two AST subtrees and return a similarity score between 0 and 1."""
         if not node1 and not node2:
             return 1.0
         if not node1 or not node2:
             return 0.0
-        if node1.get('type') != node2.get('type'):
+        if node1.type != node2.type:
             return 0.0
         # Compare children recursively
-        children1 = node1.get('children', [])
-        children2 = node2.get('children', [])
+        children1 = node1.children
+        children2 = node2.children
         if not children1 and not children2:
             # Compare leaf node values if present
-            val1 = node1.get('name') or node1.get('value') or node1.get('text')
-            val2 = node2.get('name') or node2.get('value') or node2.get('text')
+            val1 = node1.name or node1.value or node1.text
+            val2 = node2.name or node2.value or node2.text
             return 1.0 if val1 == val2 else 0.8 if (val1 is None or val2 is None) else 0.0
         # Pairwise match children (greedy best match)
         matched = 0
@@ -310,13 +336,11 @@ class JSLogicAnalyzer:
         total = max(len(children1), len(children2))
         return matched / total if total else 1.0
 
-    def _compare_function_bodies(self, func1: Dict, func2: Dict) -> float:
+    def _compare_function_bodies(self, func1: ASTNode, func2: ASTNode) -> float:
         """Compare function bodies using tree-based similarity."""
-        body1 = func1.get('body', {})
-        body2 = func2.get('body', {})
-        return self._tree_similarity(body1, body2)
+        return self._tree_similarity(func1.body, func2.body)
 
-    def _compare_imports(self, tree1: Dict, tree2: Dict) -> float:
+    def _compare_imports(self, tree1: Optional[ASTNode], tree2: Optional[ASTNode]) -> float:
         """Compare import/export statements between two ASTs."""
         imports1 = self._extract_imports(tree1)
         imports2 = self._extract_imports(tree2)
@@ -330,34 +354,38 @@ class JSLogicAnalyzer:
         matches = 0
         total = max(len(imports1), len(imports2))
         
+        # Bucket imports by source so each import only visits same-source candidates
+        by_source = defaultdict(list)
+        for imp2 in imports2:
+            by_source[imp2.source].append(imp2)
         for imp1 in imports1:
             best_match = 0.0
-            for imp2 in imports2:
-                if imp1.get('source') == imp2.get('source'):
-                    # Compare specifiers
-                    spec_similarity = self._compare_import_specifiers(
-                        imp1.get('specifiers', []),
-                        imp2.get('specifiers', [])
-                    )
-                    best_match = max(best_match, spec_similarity)
+            for imp2 in by_source.get(imp1.source, ()):
+                # Compare specifiers
+                spec_similarity = self._compare_import_specifiers(
+                    imp1.specifiers,
+                    imp2.specifiers
+                )
+                best_match = max(best_match, spec_similarity)
             matches += best_match
             
         return matches / total
 
-    def _extract_imports(self, tree: Dict) -> List[Dict]:
+    def _extract_imports(self, tree: Optional[ASTNode]) -> List[ASTNode]:
         """Extract all import/export declarations from AST."""
         imports = []
         
         def traverse(node):
-            if node.get('type') in ('import_declaration', 'export_declaration'):
+            if node.type in ('import_declaration', 'export_declaration'):
                 imports.append(node)
-            for child in node.get('children', []):
+            for child in node.children:
                 traverse(child)
                 
-        traverse(tree)
+        if tree is not None:
+            traverse(tree)
         return imports
 
-    def _compare_import_specifiers(self, spec1: List[Dict], spec2: List[Dict]) -> float:
+    def _compare_import_specifiers(self, spec1: List[ASTNode], spec2: List[ASTNode]) -> float:
         """Compare import/export specifiers."""
         if not spec1 and not spec2:
             return 1.0
@@ -365,15 +393,15 @@ class JSLogicAnalyzer:
             return 0.0
             
         # Compare specifier names
-        names1 = {s.get('name') for s in spec1}
-        names2 = {s.get('name') for s in spec2}
+        names1 = {s.name for s in spec1}
+        names2 = {s.name for s in spec2}
         
         intersection = len(names1 & names2)
         union = len(names1 | names2)
         
         return intersection / union if union else 0.0
 
-    def _compare_classes(self, tree1: Dict, tree2: Dict) -> float:
+    def _compare_classes(self, tree1: Optional[ASTNode], tree2: Optional[ASTNode]) -> float:
         """Compare class declarations between two ASTs."""
         classes1 = self._extract_classes(tree1)
         classes2 = self._extract_classes(tree2)
@@ -387,34 +415,37 @@ class JSLogicAnalyzer:
         matches = 0
         total = max(len(classes1), len(classes2))
         
+        by_name = defaultdict(list)
+        for class2 in classes2:
+            by_name[class2.name].append(class2)
         for class1 in classes1:
             best_match = 0.0
-            for class2 in classes2:
-                if class1.get('name') == class2.get('name'):
-                    # Compare methods
-                    method_similarity = self._compare_class_methods(
-                        class1.get('methods', []),
-                        class2.get('methods', [])
-                    )
-                    best_match = max(best_match, method_similarity)
+            for class2 in by_name.get(class1.name, ()):
+                # Compare methods
+                method_similarity = self._compare_class_methods(
+                    class1.methods,
+                    class2.methods
+                )
+                best_match = max(best_match, method_similarity)
             matches += best_match
             
         return matches / total
 
-    def _extract_classes(self, tree: Dict) -> List[Dict]:
+    def _extract_classes(self, tree: Optional[ASTNode]) -> List[ASTNode]:
         """Extract all class declarations from AST."""
         classes = []
         
         def traverse(node):
-            if node.get('type') in ('class_declaration', 'class_expression'):
+            if node.type in ('class_declaration', 'class_expression'):
                 classes.append(node)
-            for child in node.get('children', []):
+            for child in node.children:
                 traverse(child)
                 
-        traverse(tree)
+        if tree is not None:
+            traverse(tree)
         return classes
 
-    def _compare_class_methods(self, methods1: List[Dict], methods2: List[Dict]) -> float:
+    def _compare_class_methods(self, methods1: List[ASTNode], methods2: List[ASTNode]) -> float:
         """Compare methods between two classes."""
         if not methods1 and not methods2:
             return 1.0
@@ -425,18 +456,22 @@ class JSLogicAnalyzer:
         matches = 0
         total = max(len(methods1), len(methods2))
         
+        # Method names are (almost always) unique, so look candidates up by name
+        # instead of scanning every method of the other class
+        by_name = defaultdict(list)
+        for method2 in methods2:
+            by_name[method2.name].append(method2)
         for method1 in methods1:
             best_match = 0.0
-            for method2 in methods2:
-                if method1.get('name') == method2.get('name'):
-                    # Compare method bodies
-                    body_similarity = self._compare_function_bodies(method1, method2)
-                    best_match = max(best_match, body_similarity)
+            for method2 in by_name.get(method1.name, ()):
+                # Compare method bodies
+                body_similarity = self._compare_function_bodies(method1, method2)
+                best_match = max(best_match, body_similarity)
             matches += best_match
             
         return matches / total
 
-    def _compare_control_flow(self, tree1: Dict, tree2: Dict) -> float:
+    def _compare_control_flow(self, tree1: Optional[ASTNode], tree2: Optional[ASTNode]) -> float:
         """Compare control flow structures between two ASTs."""
         flow1 = self._extract_control_flow(tree1)
         flow2 = self._extract_control_flow(tree2)
@@ -453,15 +488,15 @@ class JSLogicAnalyzer:
         for node1 in flow1:
             best_match = 0.0
             for node2 in flow2:
-                if node1.get('type') == node2.get('type'):
+                if node1.type == node2.type:
                     # Compare conditions and bodies
                     condition_similarity = self._compare_conditions(
-                        node1.get('condition', {}),
-                        node2.get('condition', {})
+                        node1.condition,
+                        node2.condition
                     )
-                    body_similarity = self._compare_function_bodies(
-                        node1.get('body', {}),
-                        node2.get('body', {})
+                    body_similarity = self._tree_similarity(
+                        node1.body,
+                        node2.body
                     )
                     similarity = condition_similarity * 0.3 + body_similarity * 0.7
                     best_match = max(best_match, similarity)
@@ -469,23 +504,26 @@ class JSLogicAnalyzer:
             
         return matches / total
 
-    def _extract_control_flow(self, tree: Dict) -> List[Dict]:
+    def _extract_control_flow(self, tree: Optional[ASTNode]) -> List[ASTNode]:
         """Extract all control flow structures from AST."""
         flow_nodes = []
         
         def traverse(node):
-            if node.get('type') in ('for_statement', 'while_statement', 'if_statement'):
+            if node.type in ('for_statement', 'while_statement', 'if_statement'):
                 flow_nodes.append(node)
-            for child in node.get('children', []):
+            for child in node.children:
                 traverse(child)
                 
-        traverse(tree)
+        if tree is not None:
+            traverse(tree)
         return flow_nodes
 
-    def _compare_conditions(self, cond1: Dict, cond2: Dict) -> float:
+    def _compare_conditions(self, cond1: Optional[ASTNode], cond2: Optional[ASTNode]) -> float:
         """Compare control flow conditions."""
         str1 = str(cond1)
         str2 = str(cond2)
+        if _rf_ratio is not None:
+            return _rf_ratio(str1, str2) / 100.0
         return difflib.SequenceMatcher(None, str1, str2).ratio()
 
     def _get_node_name(self, node):
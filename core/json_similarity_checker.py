@@ -1,37 +1,81 @@
 import json
-import re
-from difflib import SequenceMatcher
+import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Tuple
 
+try:
+    from rapidfuzz.fuzz import ratio as _rf_ratio
+except ImportError:
+    from difflib import SequenceMatcher
+    _rf_ratio = None
+
+try:
+    # Element-wise batch scoring, added in rapidfuzz 3.6
+    from rapidfuzz.process import cpdist as _rf_cpdist
+except ImportError:
+    _rf_cpdist = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Range/comparison characters stripped from the front of dependency versions
+_VERSION_PREFIX = '^~><= '
+
+# Dependency, build output and tool cache folders that never hold the project's own config files
+_SKIP_DIRS = frozenset({'.git', 'node_modules', '.next', 'dist', 'build', '.turbo', '.cache', 'coverage'})
+
+# Framework defaults that say nothing about reuse, excluded from key similarity
+_BOILERPLATE_DEPS = frozenset({'react', 'react-dom', 'next'})
+_BOILERPLATE_SCRIPTS = frozenset({'dev', 'build', 'start', 'lint'})
+
+# package.json keys treated as config blocks besides the *Config ones
+_CONFIG_EXTRA_KEYS = frozenset({'browserslist', 'jest'})
+
+# package.json sections scored by compare_dependencies / compare_metadata
+_DEP_SECTIONS = ('dependencies', 'devDependencies', 'peerDependencies')
+_META_KEYS = ('name', 'version', 'description', 'keywords', 'author')
+
 def normalize_version(version: str) -> str:
     """Normalize version strings for comparison (e.g., ^1.0.0 -> 1.0.0)."""
     if not isinstance(version, str):
         return str(version)
-    return re.sub(r'^[\^~><= ]+', '', version.strip())
+    return version.strip().lstrip(_VERSION_PREFIX)
 
 def jaccard_similarity(set1, set2):
-    set1, set2 = set(set1), set(set2)
+    # Callers that already hold sets/frozensets skip the copy
+    if not isinstance(set1, (set, frozenset)):
+        set1 = set(set1)
+    if not isinstance(set2, (set, frozenset)):
+        set2 = set(set2)
     if not set1 and not set2:
         return 1.0
     if not set1 or not set2:
         return 0.0
-    return len(set1 & set2) / len(set1 | set2)
+    # |A | B| = |A| + |B| - |A & B|, so the union set is never built
+    inter = len(set1 & set2)
+    return inter / (len(set1) + len(set2) - inter)
 
 def fuzzy_string_similarity(a, b):
-    if not a and not b:
+    if a == b or (not a and not b):
         return 1.0
     if not a or not b:
         return 0.0
+    if _rf_ratio is not None:
+        return _rf_ratio(a, b) / 100.0
     return SequenceMatcher(None, a, b).ratio()
 
 def compare_dependencies(dep1: Dict[str, str], dep2: Dict[str, str]) -> float:
     """Compare dependency dicts by name and normalized version, with boilerplate exclusion for key similarity."""
-    boilerplate = {'react', 'react-dom', 'next'}
-    names1 = set(dep1.keys())
-    names2 = set(dep2.keys())
+    # Identical dicts (including both empty) always score 1.0
+    if dep1 == dep2:
+        return 1.0
+    names1 = frozenset(dep1)
+    names2 = frozenset(dep2)
     # Exclude boilerplate for key similarity only
-    filtered1 = names1 - boilerplate
-    filtered2 = names2 - boilerplate
+    filtered1 = names1 - _BOILERPLATE_DEPS
+    filtered2 = names2 - _BOILERPLATE_DEPS
     key_sim = jaccard_similarity(filtered1, filtered2)
     # For value similarity, use all shared keys (including boilerplate)
     shared = names1 & names2
@@ -58,27 +102,33 @@ def compare_dependencies(dep1: Dict[str, str], dep2: Dict[str, str]) -> float:
     return 0.3 * key_sim + 0.7 * value_sim
 
 def compare_scripts(s1: Dict[str, str], s2: Dict[str, str]) -> float:
-    boilerplate_scripts = {'dev', 'build', 'start', 'lint'}
     # Filter out boilerplate scripts
-    filtered1 = {k: v for k, v in s1.items() if k not in boilerplate_scripts}
-    filtered2 = {k: v for k, v in s2.items() if k not in boilerplate_scripts}
-    keys1 = set(filtered1.keys())
-    keys2 = set(filtered2.keys())
+    keys1 = frozenset(s1) - _BOILERPLATE_SCRIPTS
+    keys2 = frozenset(s2) - _BOILERPLATE_SCRIPTS
     key_sim = jaccard_similarity(keys1, keys2)
     shared = keys1 & keys2
     if not shared:
         return key_sim
-    cmd_sim = sum(fuzzy_string_similarity(filtered1[k], filtered2[k]) for k in shared) / len(shared)
+    # Identical commands (the common case across templates) score 1.0 without a string compare
+    differing = [k for k in shared if s1[k] != s2[k]]
+    total = len(shared) - len(differing)
+    if differing:
+        if _rf_cpdist is not None:
+            # Score the remaining command pairs in one call
+            scores = _rf_cpdist([s1[k] for k in differing], [s2[k] for k in differing], scorer=_rf_ratio, dtype='float64')
+            total += float(scores.sum()) / 100.0
+        else:
+            total += sum(fuzzy_string_similarity(s1[k], s2[k]) for k in differing)
+    cmd_sim = total / len(shared)
     return 0.6 * key_sim + 0.4 * cmd_sim
 
 def compare_metadata(meta1: Dict[str, Any], meta2: Dict[str, Any]) -> float:
     def normalize_str(s):
         return str(s or '').strip().lower()
     def normalize_list(lst):
-        return [normalize_str(x) for x in lst]
-    keys = ['name', 'version', 'description', 'keywords', 'author']
+        return frozenset(normalize_str(x) for x in lst)
     scores = []
-    for k in keys:
+    for k in _META_KEYS:
         v1 = meta1.get(k)
         v2 = meta2.get(k)
         if isinstance(v1, list) and isinstance(v2, list):
@@ -89,10 +139,18 @@ def compare_metadata(meta1: Dict[str, Any], meta2: Dict[str, Any]) -> float:
             scores.append(1.0 if n1 == n2 and n1 != '' else 0.0)
     return sum(scores) / len(scores) if scores else 1.0
 
-def compare_config_blocks(j1: Dict[str, Any], j2: Dict[str, Any]) -> float:
+def _config_keys(d: Dict[str, Any]) -> set:
+    """Keys of d that hold tool config blocks (eslintConfig, browserslist, jest, ...)."""
+    return {k for k in d if k in _CONFIG_EXTRA_KEYS or k.endswith('Config')}
+
+def compare_config_blocks(j1: Dict[str, Any], j2: Dict[str, Any], keys1=None, keys2=None) -> float:
     # Compare config blocks like eslintConfig, browserslist, jest, etc.
-    config_keys = set(j1.keys()) & set(j2.keys())
-    config_keys = [k for k in config_keys if k.endswith('Config') or k in ['browserslist', 'jest']]
+    # keys1/keys2 may be passed in when the caller already computed _config_keys
+    if keys1 is None:
+        keys1 = _config_keys(j1)
+    if keys2 is None:
+        keys2 = _config_keys(j2)
+    config_keys = keys1 & keys2
     if not config_keys:
         return 1.0
     scores = []
@@ -107,19 +165,20 @@ def compare_config_blocks(j1: Dict[str, Any], j2: Dict[str, Any]) -> float:
     return sum(scores) / len(scores)
 
 def package_json_similarity(pkg1: Dict[str, Any], pkg2: Dict[str, Any]) -> Tuple[float, Dict[str, float]]:
-    def missing_in_both(key):
-        return key not in pkg1 and key not in pkg2
+    def section_sim(section, compare):
+        # None marks a section missing from both files
+        if section not in pkg1 and section not in pkg2:
+            return None
+        return compare(pkg1.get(section, {}), pkg2.get(section, {}))
 
-    dep_sim = None if missing_in_both('dependencies') else compare_dependencies(pkg1.get('dependencies', {}), pkg2.get('dependencies', {}))
-    dev_sim = None if missing_in_both('devDependencies') else compare_dependencies(pkg1.get('devDependencies', {}), pkg2.get('devDependencies', {}))
-    peer_sim = None if missing_in_both('peerDependencies') else compare_dependencies(pkg1.get('peerDependencies', {}), pkg2.get('peerDependencies', {}))
-    scripts_sim = None if missing_in_both('scripts') else compare_scripts(pkg1.get('scripts', {}), pkg2.get('scripts', {}))
-    meta_sim = None if all(k not in pkg1 and k not in pkg2 for k in ['name', 'version', 'description', 'keywords', 'author']) else compare_metadata(pkg1, pkg2)
+    dep_sim, dev_sim, peer_sim = (section_sim(section, compare_dependencies) for section in _DEP_SECTIONS)
+    scripts_sim = section_sim('scripts', compare_scripts)
+    meta_sim = compare_metadata(pkg1, pkg2) if any(k in pkg1 or k in pkg2 for k in _META_KEYS) else None
     config_sim = None
-    config_keys = [k for k in pkg1.keys() if k.endswith('Config') or k in ['browserslist', 'jest']]
-    config_keys2 = [k for k in pkg2.keys() if k.endswith('Config') or k in ['browserslist', 'jest']]
+    config_keys = _config_keys(pkg1)
+    config_keys2 = _config_keys(pkg2)
     if config_keys or config_keys2:
-        config_sim = compare_config_blocks(pkg1, pkg2)
+        config_sim = compare_config_blocks(pkg1, pkg2, config_keys, config_keys2)
 
     # Updated weights: scripts weight is now 0.05
     weights = [0.5, 0.2, 0.05, 0.05, 0.05, 0.05]
@@ -151,8 +210,8 @@ def package_json_similarity(pkg1: Dict[str, Any], pkg2: Dict[str, Any]) -> Tuple
     return overall, details
 
 def compare_compiler_options(opt1: Dict[str, Any], opt2: Dict[str, Any]) -> float:
-    keys1 = set(opt1.keys())
-    keys2 = set(opt2.keys())
+    keys1 = frozenset(opt1)
+    keys2 = frozenset(opt2)
     key_sim = jaccard_similarity(keys1, keys2)
     shared = keys1 & keys2
     if not shared:
@@ -216,43 +275,72 @@ def tsconfig_json_similarity(ts1: Dict[str, Any], ts2: Dict[str, Any]) -> Tuple[
     return score, details
 
 def load_json_file(path: str) -> Dict[str, Any]:
+    """Load a JSON file, returning {} on any error."""
     try:
+        if orjson is not None:
+            # orjson parses the raw bytes directly, no text decode step
+            with open(path, 'rb') as f:
+                return orjson.loads(f.read())
         with open(path, 'r', encoding='utf-8') as f:
             return json.load(f)
     except Exception:
         return {}
 
 def find_json_file(root: str, filename: str) -> str:
-    import os
-    for dirpath, _, files in os.walk(root):
-        if filename in files:
-            return os.path.join(dirpath, filename)
+    """Return the first `filename` found under root (files in a directory win over its subdirectories)."""
+    stack = [root]
+    while stack:
+        dirpath = stack.pop()
+        subdirs = []
+        try:
+            with os.scandir(dirpath) as it:
+                for entry in it:
+                    # Symlinked files count (workspace layouts link shared configs), symlinked dirs are not followed
+                    if entry.is_file():
+                        if entry.name == filename:
+                            return entry.path
+                    elif entry.is_dir(follow_symlinks=False) and entry.name not in _SKIP_DIRS:
+                        subdirs.append(entry.path)
+        except OSError:
+            continue
+        # Reverse so subdirectories are popped in listing order
+        stack.extend(reversed(subdirs))
     return ''
 
 def analyze_json_similarity(orig_root: str, mod_root: str) -> Dict[str, Any]:
     result = {}
-    # package.json
-    orig_pkg = find_json_file(orig_root, 'package.json')
-    mod_pkg = find_json_file(mod_root, 'package.json')
-    if orig_pkg and mod_pkg:
-        pkg1 = load_json_file(orig_pkg)
-        pkg2 = load_json_file(mod_pkg)
-        pkg_score, pkg_details = package_json_similarity(pkg1, pkg2)
-        result['package_json'] = pkg_score
-        result['package_json_details'] = pkg_details
-    else:
-        result['package_json'] = None
-        result['package_json_details'] = {}
-    # tsconfig.json
-    orig_ts = find_json_file(orig_root, 'tsconfig.json')
-    mod_ts = find_json_file(mod_root, 'tsconfig.json')
-    if orig_ts and mod_ts:
-        ts1 = load_json_file(orig_ts)
-        ts2 = load_json_file(mod_ts)
-        ts_score, ts_details = tsconfig_json_similarity(ts1, ts2)
-        result['tsconfig_json'] = ts_score
-        result['tsconfig_json_details'] = ts_details
-    else:
-        result['tsconfig_json'] = None
-        result['tsconfig_json_details'] = {}
-    return result 
\ No newline at end of file
+    with ThreadPoolExecutor(max_workers=4) as ex:
+        # Discover package.json/tsconfig.json in both trees concurrently
+        found = {
+            (root_key, filename): ex.submit(find_json_file, root, filename)
+            for root_key, root in (('orig', orig_root), ('mod', mod_root))
+            for filename in ('package.json', 'tsconfig.json')
+        }
+        paths = {key: fut.result() for key, fut in found.items()}
+        # Load every discovered file concurrently
+        loaded = {key: ex.submit(load_json_file, path) for key, path in paths.items() if path}
+        docs = {key: fut.result() for key, fut in loaded.items()}
+        # package.json and tsconfig.json comparisons are independent
+        pkg_future = None
+        ts_future = None
+        if ('orig', 'package.json') in docs and ('mod', 'package.json') in docs:
+            pkg_future = ex.submit(package_json_similarity, docs[('orig', 'package.json')], docs[('mod', 'package.json')])
+        if ('orig', 'tsconfig.json') in docs and ('mod', 'tsconfig.json') in docs:
+            ts_future = ex.submit(tsconfig_json_similarity, docs[('orig', 'tsconfig.json')], docs[('mod', 'tsconfig.json')])
+        # package.json
+        if pkg_future is not None:
+            pkg_score, pkg_details = pkg_future.result()
+            result['package_json'] = pkg_score
+            result['package_json_details'] = pkg_details
+        else:
+            result['package_json'] = None
+            result['package_json_details'] = {}
+        # tsconfig.json
+        if ts_future is not None:
+            ts_score, ts_details = ts_future.result()
+            result['tsconfig_json'] = ts_score
+            result['tsconfig_json_details'] = ts_details
+        else:
+            result['tsconfig_json'] = None
+            result['tsconfig_json_details'] = {}
+    return result
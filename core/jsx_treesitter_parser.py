@@ -1,5 +1,6 @@
 import os
 import platform
+from functools import lru_cache
 from tree_sitter import Language, Parser
 
 # Determine the correct shared library path based on OS
@@ -19,55 +20,99 @@ parser = Parser()
 parser.set_language(TSX_LANGUAGE)
 
 def parse_jsx_with_treesitter(file_path: str):
-    """Parse JSX/TSX file using tree-sitter, return normalized AST and call graph."""
-    with open(file_path, 'r', encoding='utf-8') as f:
+    """Parse JSX/TSX file using tree-sitter, return normalized AST and call graph.
+
+    Results are cached per (path, mtime, size) and shared between callers, so treat them as read-only.
+    """
+    st = os.stat(file_path)
+    return _parse_jsx_cached(file_path, st.st_mtime_ns, st.st_size)
+
+def clear_parse_cache():
+    """Drop cached parse results, e.g. once the files of a comparison run have been deleted."""
+    _parse_jsx_cached.cache_clear()
+
+@lru_cache(maxsize=64)
+def _parse_jsx_cached(file_path: str, mtime_ns: int, size: int):
+    # tree-sitter works on UTF-8 bytes and reports byte offsets, so keep the source as bytes
+    with open(file_path, 'rb') as f:
         code = f.read()
-    tree = parser.parse(bytes(code, 'utf-8'))
-    root_node = tree.root_node
-
-    id_map = {}
-    lit_map = {}
-    call_graph = {}
-    function_stack = []
-    anon_func_counter = [0]
-
-    def normalize_node(node):
-        # Normalize identifiers
-        if node.type == 'identifier':
-            name = node.text.decode('utf-8')
-            if name not in id_map:
-                id_map[name] = f'id{len(id_map)}'
-            return {'type': 'identifier', 'name': id_map[name]}
-        # Normalize literals
-        if node.type in ('string', 'string_literal', 'number', 'number_literal', 'true', 'false', 'boolean'):
-            lit_key = node.text.decode('utf-8')
-            if lit_key not in lit_map:
-                lit_map[lit_key] = f'lit{len(lit_map)}'
-            return {'type': node.type, 'value': lit_map[lit_key]}
-        # Function/component definitions
-        if node.type in ('function_declaration', 'function_expression', 'arrow_function', 'method_definition'):  # covers most cases
-            func_name = get_function_name(node) or f"anon_func_{anon_func_counter[0]}"
-            if not get_function_name(node):
-                anon_func_counter[0] += 1
-            function_stack.append(func_name)
-            call_graph.setdefault(func_name, set())
-            children = [normalize_node(child) for child in node.children]
-            function_stack.pop()
-            return {'type': node.type, 'name': func_name, 'children': children}
-        # Call expressions
-        if node.type == 'call_expression':
-            callee = get_callee_name(node)
-            if function_stack and callee:
-                call_graph[function_stack[-1]].add(callee)
-            children = [normalize_node(child) for child in node.children]
-            return {'type': node.type, 'callee': callee, 'children': children}
-        # Default: recurse
-        return {
-            'type': node.type,
-            'children': [normalize_node(child) for child in node.children] if node.children else [],
-            'text': code[node.start_byte:node.end_byte] if node.child_count == 0 else None
-        }
+    return parse_jsx_code(code)
+
+_FUNCTION_TYPES = ('function_declaration', 'function_expression', 'arrow_function', 'method_definition')  # covers most cases
+_LITERAL_TYPES = ('string', 'string_literal', 'number', 'number_literal', 'true', 'false', 'boolean')
+
+class _Normalizer:
+    """Walks one tree-sitter tree into the normalized dict AST, collecting the call graph on the way."""
+    __slots__ = ('code', 'id_map', 'lit_map', 'call_graph', 'function_stack', 'anon_func_counter')
+
+    def __init__(self, code: bytes):
+        self.code = code
+        self.id_map = {}
+        self.lit_map = {}
+        self.call_graph = {}
+        self.function_stack = []
+        self.anon_func_counter = 0
+
+    def normalize(self, root):
+        # Iterative depth-first walk (deep TSX trees would otherwise recurse once per level).
+        # Each node's dict is appended to its parent's children list when the node is entered,
+        # so siblings keep source order; function scopes are popped by an exit marker.
+        code = self.code
+        id_map = self.id_map
+        lit_map = self.lit_map
+        call_graph = self.call_graph
+        function_stack = self.function_stack
+        out = []
+        stack = [(root, out)]
+        while stack:
+            node, siblings = stack.pop()
+            if node is None:
+                # Exit marker for a function/component scope
+                function_stack.pop()
+                continue
+            node_type = node.type
+            # Normalize identifiers and literals to small ints (1-based so they stay truthy
+            # in the `name or value or text` lookups and the callee check)
+            if node_type == 'identifier':
+                name = node.text.decode('utf-8')
+                if name not in id_map:
+                    id_map[name] = len(id_map) + 1
+                siblings.append({'type': 'identifier', 'name': id_map[name]})
+                continue
+            if node_type in _LITERAL_TYPES:
+                lit_key = node.text.decode('utf-8')
+                if lit_key not in lit_map:
+                    lit_map[lit_key] = len(lit_map) + 1
+                siblings.append({'type': node_type, 'value': lit_map[lit_key]})
+                continue
+            children = []
+            # Function/component definitions
+            if node_type in _FUNCTION_TYPES:
+                func_name = self.get_function_name(node)
+                if not func_name:
+                    func_name = f"anon_func_{self.anon_func_counter}"
+                    self.anon_func_counter += 1
+                function_stack.append(func_name)
+                call_graph.setdefault(func_name, set())
+                siblings.append({'type': node_type, 'name': func_name, 'children': children})
+                stack.append((None, None))
+            # Call expressions
+            elif node_type == 'call_expression':
+                callee = self.get_callee_name(node)
+                if function_stack and callee:
+                    call_graph[function_stack[-1]].add(callee)
+                siblings.append({'type': node_type, 'callee': callee, 'children': children})
+            # Default: recurse
+            else:
+                siblings.append({
+                    'type': node_type,
+                    'children': children,
+                    'text': code[node.start_byte:node.end_byte].decode('utf-8', 'replace') if node.child_count == 0 else None
+                })
+            stack.extend((child, children) for child in reversed(node.children))
+        return out[0]
 
+    @staticmethod
     def get_function_name(node):
         # Try to extract function or method name
         name_node = node.child_by_field_name('name')
@@ -75,24 +120,40 @@ def parse_jsx_with_treesitter(file_path: str):
             return name_node.text.decode('utf-8')
         return None
 
-    def get_callee_name(node):
+    def get_callee_name(self, node):
         # Try to extract callee name from call_expression
         for child in node.children:
             if child.type == 'identifier':
-                return id_map.get(child.text.decode('utf-8'), child.text.decode('utf-8'))
+                return self.id_map.get(child.text.decode('utf-8'), child.text.decode('utf-8'))
             # For member_expression, get property name
             if child.type == 'member_expression':
                 prop = child.child_by_field_name('property')
                 if prop:
-                    return id_map.get(prop.text.decode('utf-8'), prop.text.decode('utf-8'))
+                    return self.id_map.get(prop.text.decode('utf-8'), prop.text.decode('utf-8'))
         return None
 
-    normalized_ast = normalize_node(root_node)
+def parse_jsx_code(code: bytes):
+    """Parse JSX/TSX source bytes in-process, return normalized AST and call graph."""
+    tree = parser.parse(code)
+    normalizer = _Normalizer(code)
+    normalized_ast = normalizer.normalize(tree.root_node)
     # Convert call_graph sets to lists for JSON serialization
-    call_graph_out = {k: list(v) for k, v in call_graph.items()}
+    call_graph_out = {k: list(v) for k, v in normalizer.call_graph.items()}
     return {'ast': normalized_ast, 'call_graph': call_graph_out}
 
-def tree_similarity(node1: dict, node2: dict) -> float:
+def _subtree_hash(node: dict) -> int:
+    """Structural hash over exactly what tree_similarity compares, cached on the node as '_h'."""
+    h = node.get('_h')
+    if h is None:
+        children = node.get('children', [])
+        if children:
+            h = hash((node.get('type'), tuple(_subtree_hash(c) if c else 0 for c in children)))
+        else:
+            h = hash((node.get('type'), node.get('name') or node.get('value') or node.get('text')))
+        node['_h'] = h
+    return h
+
+def tree_similarity(node1: dict, node2: dict, _memo: dict = None) -> float:
     """Recursively compare two AST subtrees and return a similarity score between 0 and 1."""
     if not node1 and not node2:
         return 1.0
@@ -100,26 +161,49 @@ def tree_similarity(node1: dict, node2: dict) -> float:
         return 0.0
     if node1.get('type') != node2.get('type'):
         return 0.0
+    # Structurally identical subtrees always score 1.0
+    h1 = _subtree_hash(node1)
+    h2 = _subtree_hash(node2)
+    if h1 == h2:
+        return 1.0
+    # Repeated subtree pairs (common after identifier/literal normalization) are scored once
+    if _memo is None:
+        _memo = {}
+    cached = _memo.get((h1, h2))
+    if cached is not None:
+        return cached
     children1 = node1.get('children', [])
     children2 = node2.get('children', [])
     if not children1 and not children2:
         val1 = node1.get('name') or node1.get('value') or node1.get('text')
         val2 = node2.get('name') or node2.get('value') or node2.get('text')
         return 1.0 if val1 == val2 else 0.8 if (val1 is None or val2 is None) else 0.0
+    # A leaf against an inner node has nothing to match
+    if not children1 or not children2:
+        return 0.0
+    # Children of a different type always score 0.0, so only same-type candidates are visited
+    by_type = {}
+    for j, c2 in enumerate(children2):
+        by_type.setdefault(c2.get('type'), []).append(j)
+    # Score every same-type pair, then assign greedily from the highest similarity down.
+    # Unlike a left-to-right greedy scan this does not depend on child order.
+    pairs = []
+    for i, c1 in enumerate(children1):
+        for j in by_type.get(c1.get('type'), ()):
+            sim = tree_similarity(c1, children2[j], _memo)
+            if sim > 0.0:
+                pairs.append((-sim, i, j))
+    pairs.sort()
     matched = 0
+    used1 = set()
     used2 = set()
-    for c1 in children1:
-        best = 0.0
-        best_j = -1
-        for j, c2 in enumerate(children2):
-            if j in used2:
-                continue
-            sim = tree_similarity(c1, c2)
-            if sim > best:
-                best = sim
-                best_j = j
-        if best_j >= 0:
-            used2.add(best_j)
-        matched += best
+    for neg_sim, i, j in pairs:
+        if i in used1 or j in used2:
+            continue
+        used1.add(i)
+        used2.add(j)
+        matched -= neg_sim
     total = max(len(children1), len(children2))
-    return matched / total if total else 1.0
+    result = matched / total if total else 1.0
+    _memo[(h1, h2)] = result
+    return result
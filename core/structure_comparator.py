@@ -6,14 +6,55 @@ Compares HTML and JSX structures to find similarities and differences.
 from typing import Dict, List, Tuple, Set, Optional, Union, Any
 import difflib
 from dataclasses import dataclass, field
+from functools import lru_cache
+from types import MappingProxyType
 import logging
 import json
 import re
+import sys
+
+try:
+    from rapidfuzz.fuzz import ratio as _rf_ratio
+except ImportError:
+    _rf_ratio = None
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+# camelCase -> kebab-case for JSX style keys; CSS property names are a small vocabulary, so results are memoized
+_CAMEL_RE = re.compile(r'[A-Z]')
+_kebab_cache: Dict[str, str] = {}
+
+# One 'prop: value' declaration of an inline style; the value runs to the next ';' and may contain ':'
+_STYLE_DECL_RE = re.compile(r'([^;:]*):([^;]*)')
+
+def _camel_to_kebab(key: str) -> str:
+    css_key = _kebab_cache.get(key)
+    if css_key is None:
+        css_key = _kebab_cache[key] = _CAMEL_RE.sub(r'-\g<0>', key).lower()
+    return css_key
+
+@lru_cache(maxsize=8192)
+def _text_similarity(a: str, b: str) -> float:
+    """Memoized text ratio; labels like "Submit" recur across siblings and templates."""
+    if a == b:
+        return 1.0
+    if _rf_ratio is not None:
+        return _rf_ratio(a, b) / 100.0
+    return difflib.SequenceMatcher(None, a, b).ratio()
+
+@lru_cache(maxsize=8192)
+def _class_tokens(value: str) -> frozenset:
+    """Whitespace-separated tokens of a class string; the same class strings repeat across many nodes."""
+    return frozenset(value.split())
+
+def _all_match_trivially(attrs: Dict) -> bool:
+    """True if equal attribute dicts are guaranteed to pass _values_match for every value.
+
+    Holds for str and list values only: dict values (parsed styles) are compared by their
+    str() form there, so equal dicts with a different key order do not match.
+    """
+    return all(type(v) is str or type(v) is list for v in attrs.values())
+
 @dataclass
 class AttributeComparison:
     matching: Dict[str, str] = field(default_factory=dict)
@@ -52,7 +93,7 @@ class ComparisonResult:
                 'jsx': self.similarity_score,
             },
             'summary': {
-                'html': element_counts.copy(),
+                'html': element_counts,
                 'jsx': element_counts.copy()
             },
             'details': {
@@ -65,9 +106,18 @@ class NodeWrapper:
     def __init__(self, node: Dict):
         self.node = node
         # Create a hashable representation of the node
-        self.hash_key = self._create_hash_key(node)
-
-    def _create_hash_key(self, node: Dict) -> str:
+        self.hash_key = self.key_for(node)
+
+    @classmethod
+    def key_for(cls, node: Dict) -> str:
+        """Return the node's hash key, computed once and kept on the node so re-wrapping is a dict lookup."""
+        hash_key = node.get('_hash_key')
+        if hash_key is None:
+            hash_key = node['_hash_key'] = sys.intern(cls._create_hash_key(node))
+        return hash_key
+
+    @staticmethod
+    def _create_hash_key(node: Dict) -> str:
         """Create a unique string representation of the node."""
         try:
             key_parts = [
@@ -90,64 +140,63 @@ class NodeWrapper:
         return hash(self.hash_key)
 
 class StructureComparator:
+    # Static name mappings, shared read-only by all instances
+    jsx_to_html_tags = MappingProxyType({
+        'div': 'div',
+        'span': 'span',
+        'p': 'p',
+        'a': 'a',
+        'button': 'button',
+        'input': 'input',
+        'form': 'form',
+        'img': 'img',
+        'ul': 'ul',
+        'ol': 'ol',
+        'li': 'li',
+        'h1': 'h1',
+        'h2': 'h2',
+        'h3': 'h3',
+        'h4': 'h4',
+        'h5': 'h5',
+        'h6': 'h6'
+    })
+
+    # Add attribute name mappings
+    jsx_to_html_attrs = MappingProxyType({
+        'className': 'class',
+        'htmlFor': 'for',
+        'onClick': 'onclick',
+        'onChange': 'onchange',
+        'onSubmit': 'onsubmit',
+        'onKeyDown': 'onkeydown',
+        'onKeyUp': 'onkeyup',
+        'onFocus': 'onfocus',
+        'onBlur': 'onblur'
+    })
+
+    # Add style property mappings
+    style_property_mappings = MappingProxyType({
+        'backgroundColor': 'background-color',
+        'fontSize': 'font-size',
+        'fontWeight': 'font-weight',
+        'marginLeft': 'margin-left',
+        'marginRight': 'margin-right',
+        'marginTop': 'margin-top',
+        'marginBottom': 'margin-bottom',
+        'paddingLeft': 'padding-left',
+        'paddingRight': 'padding-right',
+        'paddingTop': 'padding-top',
+        'paddingBottom': 'padding-bottom'
+    })
+
     def __init__(self, attribute_ignore_list=None):
-        self.jsx_to_html_tags = {
-            'div': 'div',
-            'span': 'span',
-            'p': 'p',
-            'a': 'a',
-            'button': 'button',
-            'input': 'input',
-            'form': 'form',
-            'img': 'img',
-            'ul': 'ul',
-            'ol': 'ol',
-            'li': 'li',
-            'h1': 'h1',
-            'h2': 'h2',
-            'h3': 'h3',
-            'h4': 'h4',
-            'h5': 'h5',
-            'h6': 'h6'
-        }
-        
-        # Add attribute name mappings
-        self.jsx_to_html_attrs = {
-            'className': 'class',
-            'htmlFor': 'for',
-            'onClick': 'onclick',
-            'onChange': 'onchange',
-            'onSubmit': 'onsubmit',
-            'onKeyDown': 'onkeydown',
-            'onKeyUp': 'onkeyup',
-            'onFocus': 'onfocus',
-            'onBlur': 'onblur'
-        }
-        
-        # Add style property mappings
-        self.style_property_mappings = {
-            'backgroundColor': 'background-color',
-            'fontSize': 'font-size',
-            'fontWeight': 'font-weight',
-            'marginLeft': 'margin-left',
-            'marginRight': 'margin-right',
-            'marginTop': 'margin-top',
-            'marginBottom': 'margin-bottom',
-            'paddingLeft': 'padding-left',
-            'paddingRight': 'padding-right',
-            'paddingTop': 'padding-top',
-            'paddingBottom': 'padding-bottom'
-        }
         self.attribute_ignore_list = attribute_ignore_list or []
+        # Split the ignore list once into exact names and 'prefix*' patterns
+        self._ignore_exact = frozenset(p for p in self.attribute_ignore_list if not p.endswith('*'))
+        self._ignore_prefixes = tuple(p[:-1] for p in self.attribute_ignore_list if p.endswith('*'))
 
     def _should_ignore_attr(self, attr_name):
-        for pattern in self.attribute_ignore_list:
-            if pattern.endswith('*'):
-                if attr_name.startswith(pattern[:-1]):
-                    return True
-            elif attr_name == pattern:
-                return True
-        return False
+        return attr_name in self._ignore_exact or attr_name.startswith(self._ignore_prefixes)
 
     def normalize_jsx_node(self, node: Dict) -> Dict:
         """Convert JSX AST node to a normalized format."""
@@ -190,11 +239,7 @@ class StructureComparator:
         normalized = {}
         for key, value in style_obj.items():
             # Convert camelCase to kebab-case
-            css_key = self.style_property_mappings.get(key) or re.sub(
-                r'[A-Z]',
-                lambda m: f'-{m.group(0).lower()}',
-                key
-            )
+            css_key = self.style_property_mappings.get(key) or _camel_to_kebab(key)
             normalized[css_key] = value
         
         return '; '.join(f'{k}: {v}' for k, v in sorted(normalized.items()))
@@ -226,15 +271,11 @@ class StructureComparator:
     def _values_match(self, html_value: Any, jsx_value: Any) -> bool:
         """Compare attribute values with normalization."""
         try:
-            logger.debug(f"Comparing values - HTML: {type(html_value)}, {html_value} | JSX: {type(jsx_value)}, {jsx_value}")
-
             # Handle class names
             if isinstance(html_value, (list, str)) and isinstance(jsx_value, (list, str)):
                 # Convert both to sets of strings for comparison
-                html_classes = set(html_value if isinstance(html_value, list) 
-                                 else html_value.split())
-                jsx_classes = set(jsx_value if isinstance(jsx_value, list)
-                                else jsx_value.split())
+                html_classes = frozenset(html_value) if isinstance(html_value, list) else _class_tokens(html_value)
+                jsx_classes = frozenset(jsx_value) if isinstance(jsx_value, list) else _class_tokens(jsx_value)
                 return html_classes == jsx_classes
             
             # Handle JSX classes that might come as list
@@ -263,45 +304,67 @@ class StructureComparator:
 
     def _parse_style_string(self, style: Union[str, Dict]) -> Dict:
         """Parse CSS style string or dict into normalized dictionary."""
-        try:
-            logger.debug(f"Parsing style - Type: {type(style)}, Value: {style}")
-
-            if isinstance(style, dict):
-                return {k.strip(): v.strip() for k, v in style.items()}
-            
-            if not isinstance(style, str):
-                return {}
-            
-            result = {}
-            for declaration in style.split(';'):
-                if ':' in declaration:
-                    prop, value = declaration.split(':', 1)
-                    result[prop.strip()] = value.strip()
-            return result
+        if isinstance(style, dict):
+            return {k.strip(): (v.strip() if isinstance(v, str) else v) for k, v in style.items()}
 
-        except Exception as e:
-            logger.error(f"Error parsing style: {str(e)}", exc_info=True)
+        if not isinstance(style, str):
             return {}
 
+        return {prop.strip(): value.strip() for prop, value in _STYLE_DECL_RE.findall(style)}
+
+    def _filter_attrs(self, attrs: Dict) -> Dict:
+        """Drop ignored attributes; the result is only read, so without an ignore list it is attrs itself."""
+        if not self.attribute_ignore_list:
+            return attrs
+        return {k: v for k, v in attrs.items() if not self._should_ignore_attr(k)}
+
+    def _attribute_similarity(self, html_attrs: Dict, jsx_attrs: Dict) -> float:
+        """The similarity _compare_attributes reports, without building the detailed comparison."""
+        if not html_attrs and not jsx_attrs:
+            return 1.0
+        html_attrs_f = self._filter_attrs(html_attrs)
+        jsx_attrs_f = self._filter_attrs(jsx_attrs)
+        if html_attrs_f == jsx_attrs_f and _all_match_trivially(html_attrs_f):
+            return 1.0
+        common = html_attrs_f.keys() & jsx_attrs_f.keys()
+        total = len(html_attrs_f) + len(jsx_attrs_f) - len(common)
+        if not total:
+            return 1.0
+        match_count = 0
+        for name in common:
+            html_value = html_attrs_f[name]
+            jsx_value = jsx_attrs_f[name]
+            if html_value is not None and jsx_value is not None and self._values_match(html_value, jsx_value):
+                match_count += 1
+        return match_count / total
+
     def _compare_attributes(self, html_attrs: Dict, jsx_attrs: Dict):
         """Perform detailed attribute comparison with ignore list and similarity."""
+        if not html_attrs and not jsx_attrs:
+            return AttributeComparison(), [], 1.0
+
         matching = {}
         different = {}
         missing = {}
         extra = {}
-        total = 0
         match_count = 0
         differing_list = []
 
-        # Filter attributes by ignore list
-        html_attrs_f = {k: v for k, v in html_attrs.items() if not self._should_ignore_attr(k)}
-        jsx_attrs_f = {k: v for k, v in jsx_attrs.items() if not self._should_ignore_attr(k)}
-
-        all_keys = set(html_attrs_f.keys()) | set(jsx_attrs_f.keys())
-        for name in all_keys:
-            total += 1
-            html_value = html_attrs_f.get(name)
-            jsx_value = jsx_attrs_f.get(name)
+        html_attrs_f = self._filter_attrs(html_attrs)
+        jsx_attrs_f = self._filter_attrs(jsx_attrs)
+
+        # Identical attribute sets (the usual case for unchanged elements) match value for value
+        if html_attrs_f == jsx_attrs_f and _all_match_trivially(html_attrs_f):
+            return AttributeComparison(matching=dict(html_attrs_f)), differing_list, 1.0
+
+        # Split the keys once with set arithmetic; only shared keys need a value comparison
+        html_keys = html_attrs_f.keys()
+        jsx_keys = jsx_attrs_f.keys()
+        common = html_keys & jsx_keys
+        total = len(html_keys) + len(jsx_keys) - len(common)
+        for name in common:
+            html_value = html_attrs_f[name]
+            jsx_value = jsx_attrs_f[name]
             if html_value is not None and jsx_value is not None:
                 if self._values_match(html_value, jsx_value):
                     matching[name] = html_value
@@ -315,6 +378,16 @@ class StructureComparator:
             elif jsx_value is not None:
                 extra[name] = jsx_value
                 differing_list.append({'attribute': name, 'html': None, 'jsx': jsx_value})
+        for name in html_keys - jsx_keys:
+            html_value = html_attrs_f[name]
+            if html_value is not None:
+                missing[name] = html_value
+                differing_list.append({'attribute': name, 'html': html_value, 'jsx': None})
+        for name in jsx_keys - html_keys:
+            jsx_value = jsx_attrs_f[name]
+            if jsx_value is not None:
+                extra[name] = jsx_value
+                differing_list.append({'attribute': name, 'html': None, 'jsx': jsx_value})
 
         attr_similarity = match_count / total if total > 0 else 1.0
         return AttributeComparison(
@@ -326,70 +399,82 @@ class StructureComparator:
 
     def _fuzzy_text_similarity(self, a: str, b: str) -> float:
         """Return a similarity score between 0 and 1 for two strings."""
-        return difflib.SequenceMatcher(None, a, b).ratio()
+        return _text_similarity(a, b)
+
+    @staticmethod
+    def _partial_score(attr_similarity: float, text_similarity: Optional[float]) -> float:
+        """Score of a 'different' element: half attributes, half text (None counts as 1.0 for non-text elements)."""
+        if text_similarity is None:
+            text_similarity = 1.0
+        return min(0.5 * attr_similarity + 0.5 * text_similarity, 1.0)
 
     def _compare_nodes(self, html_node: Dict, jsx_node: Dict,
                       element_comparisons: List, attr_details: Dict) -> None:
-        try:
-            # Handle text nodes
-            if html_node.get('type') == 'text' and jsx_node.get('type') == 'text':
-                html_text = html_node.get('content', '').strip()
-                jsx_text = jsx_node.get('content', '').strip()
-                text_similarity = self._fuzzy_text_similarity(html_text, jsx_text)
-                if text_similarity == 1.0:
-                    element_comparisons.append({'type': 'match', 'html': html_node, 'jsx': jsx_node, 'text_similarity': text_similarity})
-                else:
-                    element_comparisons.append({'type': 'different', 'html': html_node, 'jsx': jsx_node, 'attribute_similarity': 1.0, 'text_similarity': text_similarity})
-                return
-
-            # Skip script content comparison but count as matching if tags match
-            if html_node.get('tag') == 'script' and jsx_node.get('tag') == 'script':
-                element_comparisons.append({'type': 'match', 'html': html_node, 'jsx': jsx_node, 'attribute_similarity': 1.0, 'text_similarity': 1.0})
-                return
-
-            html_tag = html_node.get('tag', '').lower()
-            jsx_tag = jsx_node.get('tag', '').lower()
-
-            if html_tag == jsx_tag:
-                attrs_match, attr_diff_list, attr_similarity = self._compare_attributes(
-                    html_node.get('attrs', {}),
-                    jsx_node.get('attrs', {})
-                )
-                attr_details[html_tag] = attrs_match
-
-                html_children = html_node.get('children', [])
-                jsx_children = jsx_node.get('children', [])
-                html_text = self._get_single_text_content(html_children)
-                jsx_text = self._get_single_text_content(jsx_children)
-                text_similarity = None
-                if html_text is not None and jsx_text is not None:
-                    text_similarity = self._fuzzy_text_similarity(html_text, jsx_text)
-
-                if attr_similarity == 1.0 and (text_similarity is None or text_similarity == 1.0):
-                    element_comparisons.append({'type': 'match', 'html': html_node, 'jsx': jsx_node, 'attribute_similarity': attr_similarity, 'text_similarity': text_similarity})
-                else:
-                    element_comparisons.append({
-                        'type': 'different',
-                        'html': html_node,
-                        'jsx': jsx_node,
-                        'attribute_similarity': attr_similarity,
-                        'text_similarity': text_similarity,
-                        'differing_attributes': attr_diff_list,
-                        'html_text': html_text,
-                        'jsx_text': jsx_text
-                    })
-                if html_text is None or jsx_text is None:
-                    self._compare_children(
-                        html_children,
-                        jsx_children,
-                        element_comparisons,
-                        attr_details
-                    )
+        # Walk both trees with an explicit stack instead of recursing per level. Entries are node
+        # pairs still to compare, or (None, entries) holding a sibling list's missing/extra entries,
+        # which are emitted after that list's matched subtrees, as the recursive walk did.
+        # Errors propagate to compare_structures, which logs them once.
+        stack = [(html_node, jsx_node)]
+        while stack:
+            html_node, jsx_node = stack.pop()
+            if html_node is None:
+                element_comparisons.extend(jsx_node)
+                continue
+            children = self._compare_node_pair(html_node, jsx_node, element_comparisons, attr_details)
+            if children is not None:
+                pairs, unmatched = self._match_children(*children)
+                if unmatched:
+                    stack.append((None, unmatched))
+                stack.extend(reversed(pairs))
+
+    def _compare_node_pair(self, html_node: Dict, jsx_node: Dict,
+                           element_comparisons: List, attr_details: Dict) -> Optional[Tuple[List, List]]:
+        """Compare one node pair; return its (html, jsx) children when they still need comparing."""
+        # Handle text nodes
+        if html_node.get('type') == 'text' and jsx_node.get('type') == 'text':
+            html_text = html_node.get('content', '').strip()
+            jsx_text = jsx_node.get('content', '').strip()
+            text_similarity = self._fuzzy_text_similarity(html_text, jsx_text)
+            if text_similarity == 1.0:
+                element_comparisons.append(('match', html_node, jsx_node, 1.0))
             else:
-                element_comparisons.append({'type': 'different', 'html': html_node, 'jsx': jsx_node, 'attribute_similarity': 0.0, 'text_similarity': 0.0, 'tag_mismatch': True})
-        except Exception as e:
-            logger.error(f"Error comparing nodes: {str(e)}", exc_info=True)
-            raise
+                element_comparisons.append(('different', html_node, jsx_node, self._partial_score(1.0, text_similarity)))
+            return None
+
+        # Skip script content comparison but count as matching if tags match
+        if html_node.get('tag') == 'script' and jsx_node.get('tag') == 'script':
+            element_comparisons.append(('match', html_node, jsx_node, 1.0))
+            return None
+
+        html_tag = html_node.get('tag', '').lower()
+        jsx_tag = jsx_node.get('tag', '').lower()
+
+        if html_tag != jsx_tag:
+            # Tag mismatch
+            element_comparisons.append(('different', html_node, jsx_node, 0.0))
+            return None
+
+        html_attrs = html_node.get('attrs', {})
+        jsx_attrs = jsx_node.get('attrs', {})
+        attr_similarity = self._attribute_similarity(html_attrs, jsx_attrs)
+        # Only the last pair per tag is reported, so keep the attrs and build the detail at the end
+        attr_details[html_tag] = (html_attrs, jsx_attrs)
+
+        html_children = html_node.get('children', [])
+        jsx_children = jsx_node.get('children', [])
+        html_text = self._get_single_text_content(html_children)
+        jsx_text = self._get_single_text_content(jsx_children)
+        text_similarity = None
+        if html_text is not None and jsx_text is not None:
+            text_similarity = self._fuzzy_text_similarity(html_text, jsx_text)
+
+        if attr_similarity == 1.0 and (text_similarity is None or text_similarity == 1.0):
+            element_comparisons.append(('match', html_node, jsx_node, 1.0))
+        else:
+            element_comparisons.append(('different', html_node, jsx_node, self._partial_score(attr_similarity, text_similarity)))
+        if html_text is None or jsx_text is None:
+            return html_children, jsx_children
+        return None
 
     def _get_single_text_content(self, children: list) -> str:
         """If children is a single text node, return its content, else None."""
@@ -397,72 +482,66 @@ class StructureComparator:
             return children[0].get('content', '').strip()
         return None
 
-    def _compare_children(self, html_children: List, jsx_children: List,
-                         element_comparisons: List, attr_details: Dict) -> None:
-        try:
-            wrapped_html = [NodeWrapper(node) for node in html_children]
-            wrapped_jsx = [NodeWrapper(node) for node in jsx_children]
-            matcher = difflib.SequenceMatcher(None, wrapped_html, wrapped_jsx)
-            matched_html_indices = set()
-            matched_jsx_indices = set()
-            for i, j, n in matcher.get_matching_blocks():
-                if n == 0:
-                    continue
-                matched_html_indices.update(range(i, i + n))
-                matched_jsx_indices.update(range(j, j + n))
-                for offset in range(n):
-                    self._compare_nodes(
-                        html_children[i + offset],
-                        jsx_children[j + offset],
-                        element_comparisons,
-                        attr_details
-                    )
-            for i in range(len(html_children)):
-                if i not in matched_html_indices:
-                    element_comparisons.append({'type': 'missing', 'html': html_children[i], 'jsx': None})
-            for j in range(len(jsx_children)):
-                if j not in matched_jsx_indices:
-                    element_comparisons.append({'type': 'extra', 'html': None, 'jsx': jsx_children[j]})
-        except Exception as e:
-            logger.error(f"Error comparing children: {str(e)}", exc_info=True)
-            raise
+    def _match_children(self, html_children: List, jsx_children: List) -> Tuple[List, List]:
+        """Align two sibling lists; return the matched (html, jsx) pairs and the missing/extra entries."""
+        # Match on the interned key strings directly; equality is the same as NodeWrapper's,
+        # but str hashing/comparison stays in C instead of calling __hash__/__eq__ per element
+        html_keys = [NodeWrapper.key_for(node) for node in html_children]
+        jsx_keys = [NodeWrapper.key_for(node) for node in jsx_children]
+        if html_keys == jsx_keys and len(jsx_keys) < 200:
+            # Identical sibling sequences below SequenceMatcher's autojunk threshold
+            # always come back as one full-length block, so skip the matcher
+            matching_blocks = [(0, 0, len(html_keys))]
+        else:
+            matching_blocks = difflib.SequenceMatcher(None, html_keys, jsx_keys).get_matching_blocks()
+        # Blocks are increasing in both i and j, so the unmatched children are the gaps between them
+        pairs = []
+        missing = []
+        extra = []
+        prev_i = prev_j = 0
+        for i, j, n in matching_blocks:
+            missing.extend(html_children[prev_i:i])
+            extra.extend(jsx_children[prev_j:j])
+            pairs.extend(zip(html_children[i:i + n], jsx_children[j:j + n]))
+            prev_i = i + n
+            prev_j = j + n
+        missing.extend(html_children[prev_i:])
+        extra.extend(jsx_children[prev_j:])
+        unmatched = [('missing', node, None, 0.0) for node in missing]
+        unmatched.extend(('extra', None, node, 0.0) for node in extra)
+        return pairs, unmatched
 
     def compare_structures(self, html_tree: Dict, jsx_tree: Dict) -> ComparisonResult:
         try:
+            # Entries are (kind, html_node, jsx_node, score) with kind in match/different/missing/extra
             element_comparisons = []
             attr_details = {}
             if html_tree and jsx_tree:
                 self._compare_nodes(html_tree, jsx_tree, element_comparisons, attr_details)
             else:
                 if html_tree:
-                    element_comparisons.append({'type': 'missing', 'html': html_tree, 'jsx': None})
+                    element_comparisons.append(('missing', html_tree, None, 0.0))
                 if jsx_tree:
-                    element_comparisons.append({'type': 'extra', 'html': None, 'jsx': jsx_tree})
+                    element_comparisons.append(('extra', None, jsx_tree, 0.0))
+            # Detailed attribute comparison only for the last element pair kept per tag
+            attr_details = {tag: self._compare_attributes(html_attrs, jsx_attrs)[0]
+                            for tag, (html_attrs, jsx_attrs) in attr_details.items()}
             # Per-element score aggregation
             element_scores = []
             matching = []
             different = []
             missing = []
             extra = []
-            for comp in element_comparisons:
-                if comp['type'] == 'match':
-                    element_scores.append(1.0)
-                    matching.append((comp['html'], comp['jsx']))
-                elif comp['type'] == 'different':
-                    attr_score = comp.get('attribute_similarity', 0)
-                    text_score = comp.get('text_similarity', 0)
-                    # If text_score is None, treat as 1.0 (for non-text elements)
-                    if text_score is None:
-                        text_score = 1.0
-                    partial_score = 0.5 * attr_score + 0.5 * text_score
-                    element_scores.append(min(partial_score, 1.0))
-                    different.append((comp['html'], comp['jsx']))
-                elif comp['type'] == 'missing':
-                    element_scores.append(0.0)
-                    missing.append(comp['html'])
-                elif comp['type'] == 'extra':
-                    element_scores.append(0.0)
-                    extra.append(comp['jsx'])
+            for kind, html_node, jsx_node, score in element_comparisons:
+                element_scores.append(score)
+                if kind == 'match':
+                    matching.append((html_node, jsx_node))
+                elif kind == 'different':
+                    different.append((html_node, jsx_node))
+                elif kind == 'missing':
+                    missing.append(html_node)
+                elif kind == 'extra':
+                    extra.append(jsx_node)
             similarity_score = sum(element_scores) / len(element_scores) if element_scores else 0.0
             return ComparisonResult(
                 similarity_score=similarity_score,
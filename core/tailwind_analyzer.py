@@ -3,50 +3,178 @@ Tailwind Analyzer Module
 Analyzes and compares Tailwind CSS configurations and usage.
 """
 
+import os
 import re
 import json
 import subprocess
-from pathlib import Path
-from typing import Set, Dict, Any, Tuple, List
+from functools import lru_cache
+from typing import Dict, Any, Tuple, List, Optional
 from bs4 import BeautifulSoup
+from bs4.builder import HTMLTreeBuilder
 from collections import Counter, defaultdict
 
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+# Attributes BeautifulSoup splits into lists; locations format them the same way on the lxml path
+_LIST_ATTRS = HTMLTreeBuilder.DEFAULT_CDATA_LIST_ATTRIBUTES
+_FEED_CHUNK = 1 << 16
+
+# Documents lxml reads differently from html.parser go through BeautifulSoup instead
+_ATTR_CHARS = r'(?:"[^"]*"|\'[^\']*\'|[^\'">])'
+_CLASS_ATTR = r'class(?<![^\s"\'/]class)\s*='
+_LXML_DIVERGENT_RES = (
+    # Repeated class attributes: lxml keeps the first, html.parser the last
+    re.compile(_CLASS_ATTR + _ATTR_CHARS + '*?' + _CLASS_ATTR, re.IGNORECASE),
+    # Named references without ';', which html.parser decodes (&copy) and lxml leaves alone
+    re.compile(r'&[a-z][a-z0-9]*(?![a-z0-9;])', re.IGNORECASE),
+    # A quoted value running into markup, usually an unclosed quote the two parsers recover from differently
+    re.compile(r'=\s*(?:"[^"]*|\'[^\']*)<'),
+)
+# lxml reports a bare attribute as name=name and html.parser as name='', so a spelled-out name="name" is ambiguous
+_SELF_VALUED_ATTR = r'(?<![^\s"\'/]){0}\s*=\s*(["\']?){0}\1(?![^\s/>])'
+# lxml drops misplaced or repeated <html>/<head>/<body> tags, html.parser keeps them
+_HTML_ROOT_TAG_RE = re.compile(r'<(html|head|body)(?=[\s/>])(' + _ATTR_CHARS + '*)', re.IGNORECASE)
+_CLASS_ATTR_RE = re.compile(_CLASS_ATTR, re.IGNORECASE)
+# lxml keeps the contents of these as text, html.parser parses them as markup
+_LXML_RAW_TEXT_TAGS = frozenset({'textarea', 'title', 'xmp', 'plaintext', 'iframe', 'noembed', 'noframes'})
+# libxml2 stops at a nesting depth of 2048 even with huge_tree
+_LXML_MAX_DEPTH = 2000
+
+# Precedes the JSON results on Node's stdout, so output printed by the configs themselves is skipped
+_NODE_RESULT_MARKER = '__tailwind_configs__:'
+
+# HTML attribute names are case-insensitive, so CLASS="..." counts as a class attribute too
+_HTML_CLASS_HINT_RE = re.compile('class', re.IGNORECASE)
+
+# Double- or single-quoted class/className attribute values in JSX/TSX source
+_JSX_CLASS_RE = re.compile(r'(?:class|className)\s*=\s*(?:"([^"]*)"|\'([^\']*)\')')
+
 class TailwindAnalyzer:
     def __init__(self):
-        pass
+        # Parsed configs keyed by (path, mtime_ns, size); an unchanged file is only sent to Node once
+        self._config_cache: Dict[Tuple[str, int, int], Dict[str, Any]] = {}
+        # Extraction results keyed by (content, filetype), so an original compared against many variants is parsed once
+        self._extract_classes_cached = lru_cache(maxsize=128)(self._extract_classes)
 
     def extract_classes_html(self, content: str) -> Tuple[Counter, Dict[str, List[str]]]:
-        """Extract Tailwind classes and their locations from HTML using BeautifulSoup."""
+        """Extract Tailwind classes and their locations from HTML (streamed through lxml when installed, else BeautifulSoup)."""
+        if not _HTML_CLASS_HINT_RE.search(content):
+            return Counter(), {}
+        # lxml turns NUL into U+FFFD, html.parser keeps it
+        if (etree is not None and '\x00' not in content
+                and not any(regex.search(content) for regex in _LXML_DIVERGENT_RES)):
+            result = self._extract_classes_lxml(content)
+            if result is not None:
+                return result
         soup = BeautifulSoup(content, 'html.parser')
         class_counter = Counter()
         class_locations = defaultdict(list)
         for tag in soup.find_all(True):
             class_attr = tag.get('class')
             if class_attr:
+                # Use tag name and a string of attributes as a simple location
+                location = f"<{tag.name} {' '.join([f'{k}={v}' for k,v in tag.attrs.items() if k != 'class'])}>"
+                class_counter.update(class_attr)
                 for cls in class_attr:
-                    class_counter[cls] += 1
-                    # Use tag name and a string of attributes as a simple location
-                    location = f"<{tag.name} {' '.join([f'{k}={v}' for k,v in tag.attrs.items() if k != 'class'])}>"
                     class_locations[cls].append(location)
         return class_counter, dict(class_locations)
 
+    def _extract_classes_lxml(self, content: str) -> Optional[Tuple[Counter, Dict[str, List[str]]]]:
+        """Streaming variant of extract_classes_html that drops elements once closed.
+
+        Returns None when lxml would read the document differently from html.parser.
+        """
+        roots = {}
+        for tag, attrs in _HTML_ROOT_TAG_RE.findall(content):
+            tag = tag.lower()
+            if tag in roots:
+                return None
+            roots[tag] = bool(_CLASS_ATTR_RE.search(attrs))
+        class_counter = Counter()
+        class_locations = defaultdict(list)
+        spelled_out = {}
+        depth = 0
+        for event, elem in self._lxml_events(content):
+            if event == 'end':
+                depth -= 1
+                if elem.tag in _LXML_RAW_TEXT_TAGS and '<' in (elem.text or ''):
+                    return None
+                # Everything before a closed element has been reported; free it
+                elem.clear()
+                parent = elem.getparent()
+                if parent is not None:
+                    while elem.getprevious() is not None:
+                        del parent[0]
+                continue
+            depth += 1
+            if depth >= _LXML_MAX_DEPTH:
+                return None
+            if elem.tag in roots and roots.pop(elem.tag) != ('class' in elem.attrib):
+                return None
+            classes = elem.get('class', '').split()
+            if not classes:
+                continue
+            list_attrs = _LIST_ATTRS['*'] | _LIST_ATTRS.get(elem.tag, set())
+            attrs = []
+            for k, v in elem.items():
+                if k == 'class':
+                    continue
+                if v == k:
+                    if k not in spelled_out:
+                        pattern = _SELF_VALUED_ATTR.format(re.escape(k))
+                        spelled_out[k] = re.search(pattern, content, re.IGNORECASE) is not None
+                    if spelled_out[k]:
+                        return None
+                    v = ''
+                attrs.append(f'{k}={v.split() if k in list_attrs else v}')
+            location = f"<{elem.tag} {' '.join(attrs)}>"
+            class_counter.update(classes)
+            for cls in classes:
+                class_locations[cls].append(location)
+        # A <html>/<head>/<body> tag with classes that lxml never reported was dropped
+        if any(roots.values()):
+            return None
+        return class_counter, dict(class_locations)
+
+    @staticmethod
+    def _lxml_events(content: str):
+        parser = etree.HTMLPullParser(events=('start', 'end'), huge_tree=True)
+        for pos in range(0, len(content), _FEED_CHUNK):
+            parser.feed(content[pos:pos + _FEED_CHUNK])
+            yield from parser.read_events()
+        parser.close()
+        yield from parser.read_events()
+
     def extract_classes_jsx(self, content: str) -> Tuple[Counter, Dict[str, List[str]]]:
         """Extract Tailwind classes and their locations from JSX/TSX using regex (fallback)."""
-        class_regex = re.compile(r'(?:class|className)\s*=\s*["\"]([^"\"]+)["\"]')
+        if 'class' not in content:
+            return Counter(), {}
         class_counter = Counter()
         class_locations = defaultdict(list)
-        for match in class_regex.finditer(content):
-            classes = match.group(1).split()
+        # Matches come in source order, so count newlines only since the previous match
+        line_no = 1
+        pos = 0
+        for match in _JSX_CLASS_RE.finditer(content):
+            value = match.group(1)
+            classes = (value if value is not None else match.group(2)).split()
             # Try to get a bit of context: the line number
-            line_no = content[:match.start()].count('\n') + 1
+            line_no += content.count('\n', pos, match.start())
+            pos = match.start()
+            # split() already drops empty and surrounding whitespace
+            class_counter.update(classes)
+            location = f"line {line_no}"
             for cls in classes:
-                if cls:
-                    class_counter[cls.strip()] += 1
-                    class_locations[cls.strip()].append(f"line {line_no}")
+                class_locations[cls].append(location)
         return class_counter, dict(class_locations)
 
     def extract_classes(self, content: str, filetype: str) -> Tuple[Counter, Dict[str, List[str]]]:
-        """Unified extraction function for HTML and JSX/TSX."""
+        """Unified extraction function for HTML and JSX/TSX. Results are cached and must not be mutated."""
+        return self._extract_classes_cached(content, filetype)
+
+    def _extract_classes(self, content: str, filetype: str) -> Tuple[Counter, Dict[str, List[str]]]:
         if filetype == 'html':
             return self.extract_classes_html(content)
         elif filetype in ('jsx', 'tsx'):
@@ -56,38 +184,43 @@ class TailwindAnalyzer:
 
     def frequency_weighted_jaccard(self, c1: Counter, c2: Counter) -> float:
         """Compute frequency-weighted Jaccard similarity for two Counters."""
-        intersection = sum((c1 & c2).values())
-        union = sum((c1 | c2).values())
+        if len(c1) > len(c2):
+            c1, c2 = c2, c1
+        intersection = sum(min(count, c2[k]) for k, count in c1.items() if k in c2)
+        union = sum(c1.values()) + sum(c2.values()) - intersection
         return intersection / union if union else 1.0
 
     def set_jaccard_similarity(self, set1: set, set2: set) -> float:
         if not set1 and not set2:
             return 1.0
-        intersection = set1 & set2
-        union = set1 | set2
-        similarity = len(intersection) / len(union) if union else 0.0
+        intersection = len(set1 & set2)
+        union = len(set1) + len(set2) - intersection
+        similarity = intersection / union if union else 0.0
         return similarity
 
     def compare_classes(self, original_content: str, user_content: str, filetype: str) -> dict:
         """Compare Tailwind classes in two markup files of the same type, with frequency and location info."""
         orig_counter, orig_locations = self.extract_classes(original_content, filetype)
         user_counter, user_locations = self.extract_classes(user_content, filetype)
-        shared_classes = set(orig_counter) & set(user_counter)
-        only_in_original = set(orig_counter) - set(user_counter)
-        only_in_user = set(user_counter) - set(orig_counter)
+        orig_keys = orig_counter.keys()
+        user_keys = user_counter.keys()
+        shared_classes = orig_keys & user_keys
+        only_in_original = orig_keys - user_keys
+        only_in_user = user_keys - orig_keys
         freq_jaccard = self.frequency_weighted_jaccard(orig_counter, user_counter)
-        set_jaccard = self.set_jaccard_similarity(set(orig_counter), set(user_counter))
+        set_jaccard = self.set_jaccard_similarity(orig_keys, user_keys)
         hybrid_similarity = 0.5 * freq_jaccard + 0.5 * set_jaccard
         # Change impact: classes with largest count difference
         change_impact = []
-        all_classes = set(orig_counter) | set(user_counter)
-        for cls in all_classes:
-            diff = abs(orig_counter.get(cls, 0) - user_counter.get(cls, 0))
+        for cls in orig_keys | user_keys:
+            orig_count = orig_counter[cls]
+            user_count = user_counter[cls]
+            diff = abs(orig_count - user_count)
             if diff > 0:
                 change_impact.append({
                     'class': cls,
-                    'original_count': orig_counter.get(cls, 0),
-                    'user_count': user_counter.get(cls, 0),
+                    'original_count': orig_count,
+                    'user_count': user_count,
                     'count_diff': diff,
                     'original_locations': orig_locations.get(cls, []),
                     'user_locations': user_locations.get(cls, [])
@@ -108,20 +241,70 @@ class TailwindAnalyzer:
         }
         return result
 
-    def parse_config(self, config_path: str) -> Dict[str, Any]:
-        """Parse tailwind.config.js using Node.js and return as dict."""
-        node_script_path = config_path.replace('\\', '\\\\')
+    @staticmethod
+    def _config_key(config_path: str):
+        try:
+            st = os.stat(config_path)
+        except OSError:
+            return None
+        return (config_path, st.st_mtime_ns, st.st_size)
+
+    def _run_node(self, config_paths: List[str]) -> List[Dict[str, Any]]:
+        """Load several tailwind.config.js files in a single Node.js process; raises if the run itself fails."""
         node_script = f"""
-        const config = require('{node_script_path}');
-        console.log(JSON.stringify(config));
+        const results = {json.dumps(config_paths)}.map(p => {{
+            try {{
+                // Serialize inside the try so a circular or BigInt value only fails its own config
+                const json = JSON.stringify(require(p));
+                if (json === undefined) throw new Error('config does not export a JSON value');
+                return json;
+            }} catch (e) {{
+                return JSON.stringify({{ error: String(e && e.message || e) }});
+            }}
+        }});
+        // Configs may print while loading; the results are whatever follows the last marker
+        process.stdout.write('\\n{_NODE_RESULT_MARKER}' + JSON.stringify(results) + '\\n');
         """
+        result = subprocess.run(['node', '-e', node_script], stdin=subprocess.DEVNULL,
+                                capture_output=True, text=True, check=True)
+        marker = result.stdout.rfind(_NODE_RESULT_MARKER)
+        if marker < 0:
+            raise ValueError('node produced no config output')
+        results = json.loads(result.stdout[marker + len(_NODE_RESULT_MARKER):])
+        if len(results) != len(config_paths):
+            raise ValueError(f"expected {len(config_paths)} configs from node, got {len(results)}")
+        return [json.loads(config_json) for config_json in results]
+
+    def load_configs(self, config_paths: List[str]) -> None:
+        """Parse every uncached config in config_paths with one Node.js process."""
+        pending = {}
+        for path in config_paths:
+            key = self._config_key(path)
+            if key is not None and key not in self._config_cache:
+                pending[key] = path
+        if len(pending) > 1:
+            try:
+                self._config_cache.update(zip(pending, self._run_node(list(pending.values()))))
+                return
+            except Exception:
+                # The shared run failed as a whole (e.g. a config exited); load each file on its own
+                pass
+        for path in pending.values():
+            self.parse_config(path)
+
+    def parse_config(self, config_path: str) -> Dict[str, Any]:
+        """Parse tailwind.config.js using Node.js and return as dict."""
+        key = self._config_key(config_path)
+        if key in self._config_cache:
+            return self._config_cache[key]
         try:
-            result = subprocess.run(['node', '-e', node_script], capture_output=True, text=True, check=True)
-            config_json = result.stdout.strip()
-            config = json.loads(config_json)
-            return config
+            config = self._run_node([config_path])[0]
         except Exception as e:
+            # Failed runs are not cached, so a later call tries again
             return {'error': str(e)}
+        if key is not None:
+            self._config_cache[key] = config
+        return config
 
     def extract_theme_extensions(self, config: Dict[str, Any]) -> Dict[str, Any]:
         """Extract theme extensions (colors, spacing, fontSize, etc.) from both theme and theme.extend."""
@@ -143,6 +326,8 @@ class TailwindAnalyzer:
 
     def compare_configs(self, original_path: str, user_path: str) -> Dict[str, Any]:
         """Compare two Tailwind config files with partial subkey match (fraction of matching subkey names)."""
+        # Both configs go through one Node.js process; parse_config then reads them from the cache
+        self.load_configs([original_path, user_path])
         orig_cfg = self.parse_config(original_path)
         user_cfg = self.parse_config(user_path)
         orig_ext = self.extract_theme_extensions(orig_cfg)
@@ -194,4 +194,61 @@ def test_html_script_and_style_tags():
     div1 = get_first_element(tree1)
     div2 = get_first_element(tree2)
     result = comp.compare_structures(div1, div2)
-    assert result.similarity_score <= 1.0 
\ No newline at end of file
+    assert result.similarity_score <= 1.0 
+# Scores produced by the original recursive comparator; sibling matching and attribute
+# fast paths must reproduce them exactly
+SIBLING_MATCHING_CASES = [
+    ('<div id="a" class="x y"><p>Hello</p><p>World</p><ul><li>1</li><li>2</li><li>3</li></ul><img src="a.png"/></div>',
+     '<div class="y x" id="a"><p>Hello!</p><ul><li>1</li><li>3</li><li>4</li></ul><p>World</p><img src="b.png"/><a href="#">x</a></div>',
+     0.41735537190082644, (3, 3, 2, 3)),
+    ('<section><h1>Title</h1><div><div><div><b>deep</b></div></div></div><p>same</p><p>same</p></section>',
+     '<section><h1>Title</h1><div><div><i>deep</i></div></div><p>same</p></section>',
+     0.625, (5, 0, 2, 1)),
+    ('<div style="color: red; font-size: 2px"><span>The quick brown fox</span></div>',
+     '<div style="font-size: 2px;color: red"><span>The quick brown dog</span></div>',
+     0.7236842105263158, (0, 2, 0, 0)),
+    ('<ul><li>a</li><li>b</li><li>c</li><li>d</li></ul>',
+     '<ul><li>d</li><li>c</li><li>b</li><li>a</li></ul>',
+     0.6, (1, 4, 0, 0)),
+]
+
+@pytest.mark.parametrize('html1,html2,score,counts', SIBLING_MATCHING_CASES)
+def test_html_structure_regression_scores(html1, html2, score, counts):
+    parser = HTMLParser()
+    comp = StructureComparator()
+    div1 = get_first_element(parser.parse(html1))
+    div2 = get_first_element(parser.parse(html2))
+    result = comp.compare_structures(div1, div2)
+    assert result.similarity_score == pytest.approx(score)
+    assert (len(result.matching_elements), len(result.different_elements),
+            len(result.missing_elements), len(result.extra_elements)) == counts
+
+# Text-only differences; rapidfuzz and the difflib fallback must agree with the original difflib scores
+TEXT_SIMILARITY_CASES = [
+    ('<p>The quick brown fox</p>', '<p>The quick brown dog</p>', 0.9473684210526316),
+    ('<div><span>Hello world</span><b>Sign in</b></div>',
+     '<div><span>Hello, world!</span><b>Log in</b></div>', 0.922008547008547),
+    ('<h1>Pricing</h1>', '<h1>Our pricing plans</h1>', 0.75),
+]
+
+@pytest.mark.parametrize('html1,html2,score', TEXT_SIMILARITY_CASES)
+def test_html_text_similarity_regression_scores(html1, html2, score):
+    parser = HTMLParser()
+    comp = StructureComparator()
+    div1 = get_first_element(parser.parse(html1))
+    div2 = get_first_element(parser.parse(html2))
+    assert comp.compare_structures(div1, div2).similarity_score == pytest.approx(score)
+
+def _nested_tree(depth, leaf_text):
+    node = {'type': 'text', 'content': leaf_text}
+    for _ in range(depth):
+        node = {'type': 'element', 'tag': 'div', 'attrs': {}, 'children': [node]}
+    return node
+
+def test_structure_deep_nesting_beyond_recursion_limit():
+    comp = StructureComparator()
+    depth = sys.getrecursionlimit() * 2
+    result = comp.compare_structures(_nested_tree(depth, 'same'), _nested_tree(depth, 'same'))
+    assert result.similarity_score == 1.0
+    result = comp.compare_structures(_nested_tree(depth, 'left'), _nested_tree(depth + 1, 'left'))
+    assert result.similarity_score < 1.0
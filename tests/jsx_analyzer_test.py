@@ -4,7 +4,7 @@ import pytest
 import tempfile
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from core.structure_comparator import StructureComparator
-from core.jsx_treesitter_parser import parse_jsx_with_treesitter
+from core.jsx_treesitter_parser import parse_jsx_with_treesitter, parse_jsx_code, tree_similarity
 
 def parse_jsx_string(jsx_str):
     with tempfile.NamedTemporaryFile('w+', suffix='.jsx', delete=False) as f:
@@ -159,4 +159,49 @@ def test_jsx_invalid():
     tree1 = parse_jsx_string(jsx1)
     tree2 = parse_jsx_string(jsx2)
     result = comp.compare_structures(tree1, tree2)
-    assert result.similarity_score <= 1.0 
\ No newline at end of file
+    assert result.similarity_score <= 1.0 
+
+def _group(*names):
+    return {'type': 'group', 'children': [{'type': 'leaf', 'name': n, 'children': []} for n in names]}
+
+def test_tree_similarity_matches_best_child_pairs_first():
+    # Child pairs are assigned from the highest similarity down, independent of child order:
+    # [a,b,c]-[a,b,c] (1.0) is taken before [a,b]-[a,b,c] (2/3), leaving [a,b]-[a] (0.5)
+    first = [_group('a', 'b'), _group('a', 'b', 'c')]
+    second = {'type': 'root', 'children': [_group('a', 'b', 'c'), _group('a')]}
+    assert tree_similarity({'type': 'root', 'children': first}, second) == pytest.approx(0.75)
+    assert tree_similarity({'type': 'root', 'children': first[::-1]}, second) == pytest.approx(0.75)
+
+def test_tree_similarity_best_first_can_score_below_sequential_greedy():
+    # Taking [c,f]-[c,f,e] (2/3) first leaves [b,e]-[c] (0.0); a left-to-right scan would
+    # have paired [b,e]-[c,f,e] (1/3) and [c,f]-[c] (0.5) instead. Best-first is intended.
+    tree1 = {'type': 'root', 'children': [_group('b', 'e'), _group('c', 'f')]}
+    tree2 = {'type': 'root', 'children': [_group('c', 'f', 'e'), _group('c')]}
+    assert tree_similarity(tree1, tree2) == pytest.approx(1 / 3)
+
+def _leaf_texts(node):
+    texts = [node['text']] if node.get('text') is not None else []
+    for child in node.get('children', []):
+        texts.extend(_leaf_texts(child))
+    return texts
+
+def test_jsx_multibyte_source_leaf_text():
+    # tree-sitter reports byte offsets; leaf text after non-ASCII characters must not shift
+    code = 'const ñame = "日本語";\nfunction Greeting() { return helper(ñame); }\nfunction helper(x) { return x; }'
+    result = parse_jsx_code(code.encode('utf-8'))
+    assert _leaf_texts(result['ast']) == ['const', '=', ';', 'function', '(', ')', '{', 'return', '(', ')', ';', '}',
+                                          'function', '(', ')', '{', 'return', ';', '}']
+    assert result['call_graph'] == {'Greeting': ['helper'], 'helper': []}
+
+def test_jsx_deep_nesting_beyond_recursion_limit():
+    depth = sys.getrecursionlimit()
+    code = 'const A = () => ' + '<div>' * depth + 'x' + '</div>' * depth + ';'
+    result = parse_jsx_code(code.encode('utf-8'))
+    elements = 0
+    stack = [result['ast']]
+    while stack:
+        node = stack.pop()
+        if node['type'] == 'jsx_element':
+            elements += 1
+        stack.extend(node.get('children', []))
+    assert elements == depth
@@ -1,7 +1,12 @@
 import sys
 import os
+import random
+import shutil
 import pytest
+from collections import Counter, defaultdict
+from bs4 import BeautifulSoup
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import core.tailwind_analyzer as tailwind_analyzer
 from core.tailwind_analyzer import TailwindAnalyzer
 
 SAMPLE_HTML = '<div class="bg-red-500 text-lg flex items-center">Hello</div>'
@@ -198,4 +203,103 @@ def test_full_report_mock():
     assert 'bg-red-500' in report['shared_classes']
     assert report['config_similarity'] == 0.5
     assert 'spacing' in report['only_in_original_config']
-    assert 'borderRadius' in report['only_in_user_config'] 
\ No newline at end of file
+    assert 'borderRadius' in report['only_in_user_config'] 
+
+@pytest.mark.skipif(shutil.which('node') is None, reason='node is not installed')
+def test_load_configs_isolates_broken_configs(tmp_path):
+    good = tmp_path / 'good.config.js'
+    good.write_text("module.exports = { theme: { extend: { colors: { primary: '#123456' } } } };")
+    circular = tmp_path / 'circular.config.js'
+    circular.write_text("const c = { theme: {} }; c.self = c; module.exports = c;")
+    noisy = tmp_path / 'noisy.config.js'
+    noisy.write_text("console.log('loading {'); module.exports = { theme: { extend: { spacing: { '72': '18rem' } } } };")
+    exits = tmp_path / 'exits.config.js'
+    exits.write_text("process.exit(1);")
+    analyzer = TailwindAnalyzer()
+    analyzer.load_configs([str(good), str(circular), str(noisy), str(exits)])
+    assert analyzer.parse_config(str(good)) == {'theme': {'extend': {'colors': {'primary': '#123456'}}}}
+    assert analyzer.parse_config(str(noisy)) == {'theme': {'extend': {'spacing': {'72': '18rem'}}}}
+    assert 'error' in analyzer.parse_config(str(circular))
+    assert 'error' in analyzer.parse_config(str(exits))
+
+def test_extract_classes_jsx_quote_styles():
+    analyzer = TailwindAnalyzer()
+    jsx = '<div className="p-4 m-2">\n  <span className=\'flex  text-lg\'>A</span>\n  <b class = "p-4">B</b>\n</div>'
+    counter, locations = analyzer.extract_classes(jsx, 'jsx')
+    assert counter == {'p-4': 2, 'm-2': 1, 'flex': 1, 'text-lg': 1}
+    assert locations['p-4'] == ['line 1', 'line 3']
+    assert locations['flex'] == ['line 2']
+    # A quote of the other kind inside the value is part of the class string
+    counter, _ = analyzer.extract_classes('<a className=\'say-"hi"\' />', 'tsx')
+    assert counter == {'say-"hi"': 1}
+
+def _reference_html_classes(content):
+    # The original html.parser extraction that both HTML paths must reproduce
+    soup = BeautifulSoup(content, 'html.parser')
+    counter = Counter()
+    locations = defaultdict(list)
+    for tag in soup.find_all(True):
+        for cls in tag.get('class') or []:
+            counter[cls] += 1
+            locations[cls].append(f"<{tag.name} {' '.join([f'{k}={v}' for k, v in tag.attrs.items() if k != 'class'])}>")
+    return counter, dict(locations)
+
+def _random_html(rnd):
+    classes = ['flex', 'p-4', 'm-2', 'text-lg', 'hover:bg-blue-200', 'w-1/2', 'md:flex', '']
+    parts = ['<html><body>']
+    for i in range(rnd.randint(0, 25)):
+        tag = rnd.choice(['div', 'span', 'p', 'a', 'section', 'td'])
+        value = ' '.join(rnd.sample(classes, rnd.randint(0, 4)))
+        parts.append(rnd.choice([
+            f'<{tag} class="{value}" id="x{i}">t</{tag}>',
+            f"<{tag} class='{value}' data-k=v>u</{tag}>",
+            f'<{tag} CLASS="{value}" rel="a b">z</{tag}>',
+            f'<{tag} className="{value}">q</{tag}>',
+            '<p>classy text</p>',
+        ]))
+    parts.append('</body></html>')
+    return '\n'.join(parts)
+
+@pytest.mark.parametrize('use_lxml', [True, False])
+def test_extract_classes_html_matches_reference(monkeypatch, use_lxml):
+    if use_lxml and tailwind_analyzer.etree is None:
+        pytest.skip('lxml is not installed')
+    if not use_lxml:
+        monkeypatch.setattr(tailwind_analyzer, 'etree', None)
+    analyzer = TailwindAnalyzer()
+    rnd = random.Random(7)
+    for _ in range(200):
+        html = _random_html(rnd)
+        counter, locations = analyzer.extract_classes_html(html)
+        ref_counter, ref_locations = _reference_html_classes(html)
+        assert list(counter.items()) == list(ref_counter.items())
+        assert locations == ref_locations
+
+# Markup lxml parses differently from html.parser, which must still give the reference result
+HTML_DIVERGENT_CASES = {
+    'nesting_254': '<div class="top">' + '<div>' * 254 + '<i class="deep">x</i>' + '</div>' * 254 + '</div><p class="after">a</p>',
+    'nesting_3000': '<div class="top">' + '<div>' * 3000 + '<i class="deep">x</i>' + '</div>' * 3000 + '</div><p class="after">a</p>',
+    'textarea': '<textarea><div class="in">x</div></textarea><p class="out">a</p>',
+    'title': '<html><head><title><b class="in">x</b></title></head><body><p class="out">a</p></body></html>',
+    'plaintext': '<plaintext><b class="in">x</b><p class="out">a</p>',
+    'duplicate_class': '<div class="first" class="last">x</div>',
+    'nul': '<div class="a\x00b">x</div><p class="c">y</p>',
+    'legacy_entity': '<p class="a&copy b &notin">x</p>',
+    'bare_attribute': '<input class="i" disabled><a class="k" rel>x</a><input class="j" disabled="">',
+    'spelled_out_attribute': '<input class="i" disabled><input class="j" disabled="disabled">',
+    'misplaced_body': '<p class="c">x</p><body class="late"><p class="d">y</p>',
+    'repeated_head': '<head class="h1"></head><head class="h2"></head><p class="p">x</p>',
+    'unclosed_quote': '<p class=c><p class="u\'><p class=c>',
+}
+
+@pytest.mark.parametrize('use_lxml', [True, False])
+@pytest.mark.parametrize('html', HTML_DIVERGENT_CASES.values(), ids=HTML_DIVERGENT_CASES.keys())
+def test_extract_classes_html_divergent_markup_matches_reference(monkeypatch, use_lxml, html):
+    if use_lxml and tailwind_analyzer.etree is None:
+        pytest.skip('lxml is not installed')
+    if not use_lxml:
+        monkeypatch.setattr(tailwind_analyzer, 'etree', None)
+    counter, locations = TailwindAnalyzer().extract_classes_html(html)
+    ref_counter, ref_locations = _reference_html_classes(html)
+    assert list(counter.items()) == list(ref_counter.items())
+    assert locations == ref_locations